@@ -0,0 +1,40 @@
+"""
+Compares deleting bad y-arrays one by one in a QC loop with del Data[k] against np.delete per y-array, which Data.__delitem__ did before deletions were marked and compacted lazily.
+
+    python benchmarks/qc_deletion.py [rows] [samples]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataanalysis import Data
+
+
+def main(rows=4000, samples=64):
+    y = np.random.default_rng(0).random((rows, samples))
+    bad = np.arange(0, rows, 4)
+
+    start = time.perf_counter()
+    expected = y.copy()
+    for k in bad[::-1]:
+        expected = np.delete(expected, k, axis=0)
+    before = time.perf_counter() - start
+
+    data = Data(np.arange(float(samples)), y, properties={i: {'run': i} for i in range(rows)})
+    start = time.perf_counter()
+    for k in bad[::-1]:
+        del data[int(k)]
+    data.compact()
+    after = time.perf_counter() - start
+
+    assert np.array_equal(data.y, expected)
+    print("np.delete per y-array: %.4f s" % before)
+    print("del Data[k], compact:  %.4f s (%.1fx faster)" % (after, before/after))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,6 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import copy
+import concurrent.futures
+import itertools
+import json
+import os
+import struct
+import weakref
+import zlib
+from copy import deepcopy
 
 
 
@@ -11,18 +18,28 @@ class Data:
     PRINT_TABLE_MAXLEN = 2
     PRINT_TABLE_MAXDEPTH = 50
     
+    BUFFER_GROWTH = 2
+    
+    CHUNK_BYTES = 2**26
+    
+    GRID_CHUNK = 2**15
+    
+    COMPACT_THRESHOLD = 0.5
+    
+    FILE_MAGIC = b'DATAANA1'
+    
     
     
     # ******************************************************** Initialization and Magic Methods ********************************************************
 
-    def __init__(self, x, y, xname=None, yname=None, properties={}):
+    def __init__(self, x, y, xname=None, yname=None, properties=None, copy=True, storage_dtype=None):
         """
         Initializes a Data object. It consists of x- and y-values and a set of properties, which is a dictionairy of int-dict pairs.
         
         Parameters
         ----------
-        x: array_like or a number (float, int)
-            The x-values of the data. The dimension of x must be 0 or 1.
+        x: array_like, a number (float, int) or a tuple (start, step, n)
+            The x-values of the data. The dimension of x must be 0 or 1. A tuple describes the uniform grid start + i*step for i = 0, ..., n-1 with step > 0. A uniform grid given as tuple is stored as (start, step, n) only. An array x, which equals such a grid exactly, is kept as it is, but x-values are looked up in the grid arithmetically, see Data.get_xgrid.
             
         y: array_like or a number (float, int)
             The y-values of the data. y must be of shape (*, len(x)).
@@ -33,10 +50,15 @@ class Data:
         yname: str, optional
             A string, that describes the y-values. Default is 'y'.
         
-        properties: dictionary, optional
-            A dictionary containing int-dictionary pairs, each int corresponds to the y-arrays along the first axis of y. The dictionary must not have more keys than y.shape[0]. The inner dictionaries can contain arbitrary (dict allowed) keys and values, whatever describes the data best. Default is an empty dictionairy properties={}, which is filled with int:None pairs upon Object creation.
+        properties: dictionary or PropertyTable, optional
+            A dictionary containing int-dictionary pairs, each int corresponds to the y-arrays along the first axis of y. It is stored column-wise as a PropertyTable in Data.properties. The dictionary must not have more keys than y.shape[0]. The inner dictionaries can contain arbitrary (dict allowed) keys and values, whatever describes the data best. Default is None, i.e. an empty dictionairy, which is filled with int:None pairs upon Object creation.
+            
+        copy: bool, optional
+            If copy=True, x, y and properties are copied. If copy=False, x and y must be numpy arrays, which are wrapped without copying, and a PropertyTable given as properties is kept by reference (missing rows are filled into the given table). Only the shapes are checked in this case. Default is True.
+            
+        storage_dtype: numpy dtype, optional
+            The dtype y is stored in, e.g. np.float32 or np.float16 to halve or quarter memory and bandwidth. Reductions like stat_mean or stat_var accumulate in float64 regardless. If y has another dtype, it is converted, also if copy=False, and so are appended y-values. Default is None, i.e. the dtype of y as inferred by numpy.
             
-        
         
         
         Raises
@@ -51,14 +73,41 @@ class Data:
         
         
         
-        if type(x) not in (np.ndarray, list, float, int):
-            raise TypeError("x must be of type np.ndarray, float or int.")
+        grid = None
+        if type(x) == tuple:
+            if len(x) != 3 or type(x[2]) != int or x[2] < 1 or not x[1] > 0:
+                raise ValueError("A uniform grid x must be given as (start, step, n) with step > 0 and n >= 1.")
+            grid = (float(x[0]), float(x[1]), x[2])
+            x = np.broadcast_to(np.float64(grid[0]), (grid[2],))
         
-        if type(y) not in (np.ndarray, list, float, int):
-            raise TypeError("y must be of type np.ndarray, float or int.")
+        if copy and grid == None:
+            if type(x) not in (np.ndarray, list, float, int):
+                raise TypeError("x must be of type np.ndarray, float or int.")
+            
+            if type(y) not in (np.ndarray, list, float, int):
+                raise TypeError("y must be of type np.ndarray, float or int.")
+            
+            x = np.array(x)
+            y = np.array(y)
         
-        x = np.array(x)
-        y = np.array(y)
+        elif copy:
+            if type(y) not in (np.ndarray, list, float, int):
+                raise TypeError("y must be of type np.ndarray, float or int.")
+            
+            y = np.array(y)
+        
+        else:
+            if not isinstance(x, np.ndarray):
+                raise TypeError("x must be of type np.ndarray if copy=False.")
+            
+            if not isinstance(y, np.ndarray):
+                raise TypeError("y must be of type np.ndarray if copy=False.")
+        
+        if storage_dtype is not None:
+            y = y.astype(storage_dtype, copy=False)
+        
+        if properties is None:
+            properties = {}
         
         if x.shape != () and y.shape != ():
             if len(x) > 0:
@@ -82,22 +131,23 @@ class Data:
         elif y.shape == () and len(properties) > 1:
             raise ValueError("As y is a number, only a single or no propoerty at all are allowed for properties.")
         
-        for key in properties:
-            if type(key) != int:
-                raise ValueError("All keys in properties must be of type int.")
-            if y.shape != () and key >= y.shape[0]:
-                raise ValueError("Found key in properties %d >= y.shape[0] = %d. Key values must be smaller than y.shape[0]."%(key, y.shape[0]))
-            elif y.shape == () and key > 0:
-                raise ValueError("As y is a number, the only allowed key for properties is 0.")
-            elif type(properties[key]) != dict and properties[key] != None:
-                raise TypeError("The values of properties must be of type dict or None.")
+        if not isinstance(properties, PropertyTable):
+            for key in properties:
+                if type(key) != int:
+                    raise ValueError("All keys in properties must be of type int.")
+                if y.shape != () and key >= y.shape[0]:
+                    raise ValueError("Found key in properties %d >= y.shape[0] = %d. Key values must be smaller than y.shape[0]."%(key, y.shape[0]))
+                elif y.shape == () and key > 0:
+                    raise ValueError("As y is a number, the only allowed key for properties is 0.")
+                elif type(properties[key]) != dict and properties[key] != None:
+                    raise TypeError("The values of properties must be of type dict or None.")
         
             
-        if type(xname) not in (None, str):
+        if xname != None and type(xname) != str:
             raise TypeError("xname must be None or of type str.")
         
-        if type(xname) not in (None, str):
-            raise TypeError("xname must be None or of type str.")
+        if yname != None and type(yname) != str:
+            raise TypeError("yname must be None or of type str.")
         
             
         if y.shape == ():
@@ -112,12 +162,28 @@ class Data:
         else:
             self.dtype = 'arr-arr'
         
-        self.x = copy.deepcopy(np.array(x))
-        self.y = copy.deepcopy(np.array(y))
+        self._dead = None
+        self._aliverows = None
+        self._firstdead = 0
+        
+        self._base = None
+        self._views = None
+        
+        self._store_x(x, grid)
+        self.y = y
         
         self.xshape = x.shape
         self.yshape = y.shape
         
+        self._xbuf = None
+        self._ybuf = None
+        
+        self._executor = None
+        self._ownexecutor = False
+        self._workers = 1
+        
+        self._storagedtype = None if storage_dtype is None else np.dtype(storage_dtype)
+        
         if xname != None:
             self.xname = xname
         else:
@@ -127,21 +193,18 @@ class Data:
         else:
             self.yname = 'y'
         
-        self.properties = copy.deepcopy(properties)
-        self.properties_keys = properties.keys()
-        self.properties_maxlen = 0
+        if not isinstance(properties, PropertyTable):
+            self.properties = PropertyTable(deepcopy(properties) if copy else properties, self.length)
+        elif copy:
+            self.properties = properties.copy()
+        else:
+            self.properties = properties
+        
+        if len(self.properties) < self.length:
+            self.properties[self.length-1] = self.properties.get(self.length-1)
         
-
-        for i in range(self.length):
-
-            if i not in self.properties_keys:
-                self.properties[i] = None
-            
-            if self.properties[i] != None and len(self.properties[i]) > self.properties_maxlen:
-                self.properties_maxlen = len(self.properties[i])
-
-                
         self.properties_keys = self.properties.keys()
+        self.properties_maxlen = self.properties.maxlen()
     
     
     
@@ -169,17 +232,12 @@ class Data:
             Data represented in table format.
         """
         
-        print('\n')
-        
         if self.dtype == 'num-num':
             string = self.get_table_numnum()
         elif self.dtype == 'num-arr':
             string = self.get_table_numarr()
         elif self.dtype == 'arr-arr':
             string = self.get_table_arrarr()
-            
-        
-        print('\n')
         
         return string
     
@@ -188,24 +246,32 @@ class Data:
     
     def __getitem__(self, key):
         """
-        Returns the y-arrays as indexed. Indexing works similar as with lists and numpy arrays.
+        Returns the y-arrays as indexed. Indexing works similar as with lists and numpy arrays. A slice returns a view, i.e. Data with the selected y-arrays, which shares x, the y-buffer and the property storage with this Data, so slicing copies nothing, also not for memory-mapped Data. The storage is copied on write: before the view or this Data is changed by __setitem__, set_y, set_properties, interp_* or norm_*, the view copies its part of the storage.
         
         Parameters
         ----------
             key: int or slice
                 The index/indices of the y-arrays to be returned.
                 
+        Returns
+        -------
+            y: number, numpy array or Data
+                The y-array(s) for an int key and a view for a slice.
+                
         Raises
         ------
             IndexError
                 If key is integer and key >= Data.length or key < -Data.length.
         """
         
+        if type(key) == slice and self.dtype != 'num-num':
+            return self._view(key)
+        
         if type(key) == int:
             if key >= self.length or key < -self.length:
                 raise IndexError("Index %d is out of range for Data with length %d."%(key, self.length))
                 
-        return self.y[key]
+        return self._y[self._physical(key)]
           
           
           
@@ -232,15 +298,15 @@ class Data:
             if key >= self.length or key < -self.length:
                 raise IndexError("Index %d is out of range for Data with length %d."%(key, self.length))
                 
-                
-        self.y[key] = value
+        self._unshare()
+        self._y[self._physical(key)] = value
         
     
     
     
     def __delitem__(self, key):
         """
-        Deletes the y-arrays and corresponding properties as indexed. Indexing works similar as with lists and numpy arrays.
+        Deletes the y-arrays and corresponding properties as indexed. Indexing works similar as with lists and numpy arrays. The y-arrays are only marked as deleted, which takes O(1) for an int key, if no y-array before it has been deleted yet (e.g. when deleting from the back). Indexing and the stat_* methods skip deleted y-arrays, all other access to Data.y and Data.properties compacts the storage first. The storage is also compacted, when more than the fraction Data.COMPACT_THRESHOLD of it is deleted. To delete many y-arrays at once, Data.drop is faster.
         
         Parameters
         ----------
@@ -256,176 +322,360 @@ class Data:
         if type(key) == int:
             if key >= self.length or key < -self.length:
                 raise IndexError("Index %d is out of range for Data with length %d."%(key, self.length))
-            
-        self.y = np.delete(self.y, key, axis=0)
-        self.length = len(self.y)
         
-        if type(key) == int:
-            del(self.properties[key])
-        else:
-            for i in np.arange(self.length)[key][::-1]:
-                del(self.properties[i])
+        if type(key) == int and key < 0:
+            key += self.length
         
-        newproperties = {}
-        newproperties_maxlen = 0
-        count = 0
-        for k in self.properties:
-            newproperties[count] = self.properties[k]
-            if newproperties[count] != None and len(newproperties[count]) > newproperties_maxlen:
-                newproperties_maxlen = len(newproperties[count])
-            count += 1
-        self.properties = newproperties
-        self.properties_maxlen = newproperties_maxlen
-            
+        rows = np.atleast_1d(self._physical(key if type(key) == int else np.arange(self.length)[key]))
+        if self._dead is None:
+            self._dead = np.zeros(len(self._y), dtype=bool)
+            self._firstdead = len(self._y)
         
+        rows = rows[~self._dead[rows]]
+        self._dead[rows] = True
+        self.length -= len(rows)
+        self._aliverows = None
+        if len(rows) > 0:
+            self._firstdead = min(self._firstdead, rows.min())
         
+        if len(self._dead) - self.length > Data.COMPACT_THRESHOLD*len(self._dead):
+            self.compact()
+    
     
-
-    # ******************************************************** Standard I/O *******************************************************
     
+    
+    @property
+    def x(self):
+        """
+        The x-values of the Data. If they were given as a uniform grid (start, step, n), the array is computed on every access, so changing it does not change the Data. An array x is returned itself, but lookups use the uniform grid detected in it, so call Data.set_x after changing it in place.
+        """
         
-    def get_table_numnum(self):
+        if self._x is not None:
+            return self._x
+        start, step, n = self._grid
+        return start + np.arange(n)*step
+    
+    
+    @x.setter
+    def x(self, x):
+        self._grid = None
+        self._x = x
+    
+    
+    @property
+    def y(self):
+        """
+        The y-values of the Data. Accessing them compacts deleted y-arrays first.
+        """
         
+        if self._dead is not None:
+            self.compact()
+        return self._y
+    
+    
+    @y.setter
+    def y(self, y):
+        if self._dead is not None:
+            self._properties.delete(np.flatnonzero(self._dead))
+            self.properties_maxlen = self._properties.maxlen()
+            self._dead = None
+            self._aliverows = None
+        self._y = y
+    
+    
+    @property
+    def properties(self):
+        """
+        The properties of the Data as PropertyTable. Accessing them compacts deleted y-arrays first.
         """
-        Method for printing the Data in table format, if self.dtype = 'num-num' (x and y are numbers).
         
-        Returns
-        -------
-        string: str
-            The Data represented in table format.
+        if self._dead is not None:
+            self.compact()
+        return self._properties
+    
+    
+    @properties.setter
+    def properties(self, properties):
+        self._properties = properties
+    
+    
+    
+    
+    def _view(self, key):
+        """
+        Returns the view of the y-arrays selected by the slice key, see Data.__getitem__. The view is registered at the Data owning the storage, so either side can copy it before writing.
         """
         
+        y = self.y
+        view = self._share(y[key], self._properties.view(key))
+        view.properties_maxlen = view._properties.maxlen()
+        return view
+    
+    
+    
+    
+    def _share(self, y, properties):
+        """
+        Returns a shallow copy of the Data with y and properties, which are views of its storage, without validating them again. The copy is registered at the Data owning the storage, so either side can copy it before writing, see Data._unshare.
+        """
         
-        spacelen = Data.PRINT_TABLE_SPACELEN
-        maxlen = Data.PRINT_TABLE_MAXLEN
-        spaces = spacelen*' '
-       
-        hypherlen = 0
+        view = copy.copy(self)
+        view._y = y
+        view._ybuf = None
+        view._xbuf = None
+        view._ownexecutor = False
+        view.yshape = y.shape
+        view.length = len(y)
+        view._properties = properties
+        view.properties_keys = properties.keys()
+        
+        view._base = self if self._base is None else self._base
+        view._views = None
+        if view._base._views is None:
+            view._base._views = weakref.WeakSet()
+        view._base._views.add(view)
+        return view
+    
+    
+    
+    
+    def _unshare(self):
+        """
+        Makes sure, that changing y and the properties in place changes no other Data: a view copies its part of the storage and a Data with views lets all of them copy theirs.
+        """
         
-        string = ' x' + spaces + '|'
-        string += ' y' + spaces + '\n'
+        if self._base is not None:
+            self._y = np.array(self._y)
+            self._ybuf = None
+            self._properties = self._properties.copy()
+            self._base._views.discard(self)
+            self._base = None
         
-        hypherlen = len(string)
+        if self._views:
+            for view in list(self._views):
+                view._unshare()
+    
+    
+    
+    
+    def _store_x(self, x, grid=None):
+        """
+        Sets Data.x to the array or number x. If grid is given, only the uniform grid (start, step, n) is stored. Otherwise x is kept, and its grid is stored next to it for lookups, if x equals one exactly.
+        """
         
-        string += hypherlen*'-' + '\n'
+        if grid == None:
+            self.x = x
+            self._grid = Data._detect_grid(x)
+        else:
+            self.x = None
+            self._grid = grid
+    
+    
+    
+    
+    @staticmethod
+    def _detect_grid(x):
+        """
+        Returns (start, step, n), if the float64 array x is increasing and equals start + np.arange(n)*step exactly, and None otherwise. x is compared in chunks of Data.GRID_CHUNK values, stopping at the first chunk that differs, so the check allocates no arrays of the size of x.
+        """
         
-        if len(self.properties) != 0:
-            if self.properties[0] != None:
-                for key in self.properties[0]:
-                
-                    string += (spacelen+2)*' ' + '|'
-                    propstring = ' ' + str(key) + ':' + str(self.properties[0][key])
-                    string += propstring + (spacelen-len(propstring)+2)*' ' + '\n'
-                string += '-'*hypherlen + '\n'
+        if not isinstance(x, np.ndarray) or x.ndim != 1 or len(x) < 2 or x.dtype != np.float64:
+            return None
+        n = len(x)
+        start = float(x[0])
+        step = (float(x[-1]) - start)/(n-1)
+        if not step > 0:
+            return None
+        if start + step != x[1] or start + (n//2)*step != x[n//2]:
+            return None
+        for lo in range(0, n, Data.GRID_CHUNK):
+            hi = min(lo + Data.GRID_CHUNK, n)
+            if not np.array_equal(start + np.arange(lo, hi)*step, x[lo:hi]):
+                return None
+        return (start, step, n)
+    
+    
+    
+    
+    def _xsearch(self, values, side='left'):
+        """
+        Returns np.searchsorted(Data.x, values, side), which is computed arithmetically in O(1) per value for a uniform grid.
+        """
         
-            
+        if self._grid is None:
+            return np.searchsorted(self.x, values, side=side)
+        return Data._grid_search(self._grid, values, side)
+    
+    
+    
+    
+    def _xgrid(self):
+        """
+        Returns the uniform grid (start, step, n) of Data.x, if it is stored as one, and Data.x otherwise.
+        """
         
+        return self.x if self._grid is None else self._grid
+    
+    
+    
+    
+    @staticmethod
+    def _grid_search(grid, values, side='left'):
+        """
+        Returns np.searchsorted(x, values, side) for the uniform grid x = (start, step, n) without computing x. The index from the division is corrected by a comparison with its neighbours, such that values on the grid are found exactly as by np.searchsorted.
+        """
         
-        xstring = ' %g'%self.x
-        ystring = ' %g'%self.y
+        start, step, n = grid
+        values = np.asarray(values, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            index = np.nan_to_num(np.floor((values - start)/step) + 1, nan=n, posinf=n, neginf=0)
+        index = np.clip(index, 0, n).astype(np.intp)
         
-        string += xstring + (spacelen - len(xstring) + 2)*' ' + '|'
-        string += ystring + (spacelen - len(ystring) + 2)*' ' + '\n'
-        string += hypherlen*'-'
+        before = np.less if side == 'left' else np.less_equal
+        index += (index < n) & before(start + np.minimum(index, n-1)*step, values)
+        index -= (index > 0) & ~before(start + np.maximum(index-1, 0)*step, values)
+        return np.where(np.isnan(values), n, index)
+    
+    
+    
+    
+    def drop(self, indices):
+        """
+        Deletes the y-arrays and corresponding properties with the given indices in a single pass over the storage.
         
-        prestring = self.xname + (spacelen-len(self.xname)+2)*' ' + '|' + self.yname+ '\n'
-        prestring += hypherlen*'-' + '\n' + hypherlen*'-' + '\n'
+        Parameters
+        ----------
+            indices: int, slice, boolean mask or array-like of ints
+                The indices of the y-arrays to be deleted.
+                
+        Raises
+        ------
+            IndexError
+                If an index is out of range.
+        """
         
-        return prestring + string
+        rows = np.arange(self.length)[indices]
+        if len(np.atleast_1d(rows)) == 0:
+            return
+        del(self[rows])
+        self.compact()
     
     
-    def get_table_numarr(self):
-        
+    
+    
+    def compact(self):
+        """
+        Removes the y-arrays and properties deleted with del from the storage in a single pass.
         """
-        Method for printing the Data in table format, if self.dtype = 'num-arr' (x is a number and y is array-like).
         
-        Returns
-        -------
-        string: str
-            The Data represented in table format.
+        if self._dead is None:
+            return
+        
+        dead = self._dead
+        self._dead = None
+        self._aliverows = None
+        self._y = self._y[~dead]
+        self.yshape = self._y.shape
+        self._properties.delete(np.flatnonzero(dead))
+        self.properties_maxlen = self._properties.maxlen()
+    
+    
+    
+    
+    def lazy(self):
         """
+        Returns a LazyData, which records the calls of interp_nan, interp_nonpositive, interp_invalid, interp_to, norm_max and norm_min instead of executing them and executes them fused in a chunked pass by collect() or by one of its stat_* methods. E.g.
         
-        spacelen = Data.PRINT_TABLE_SPACELEN
-        maxlen = Data.PRINT_TABLE_MAXLEN
-        spaces = spacelen*' '
+            means = data.lazy().interp_nonpositive().interp_to(grid).norm_max().stat_mean()
         
-        hypherlen = 0
+        runs over y twice (once for the maximum and once for the means) instead of four times and never holds more than a chunk of the interpolated y-arrays. The Data itself is not changed.
         
+        Returns
+        -------
+            lazy: LazyData
+                The lazy view of the Data.
+        """
         
+        return LazyData(self)
+    
+    
+    
+    
+    def astype(self, dtype):
+        """
+        Returns a copy of the Data with y stored in dtype, e.g. np.float32 or np.float16 for less memory and bandwidth.
         
+        Parameters
+        ----------
+            dtype: numpy dtype
+                The storage dtype of y of the copy.
+                
+        Returns
+        -------
+            data: Data
+                The copy of the Data.
+        """
         
-        string = ' x' + spaces + '|'
+        return Data(np.array(self.x), self.y.astype(dtype), xname=self.xname, yname=self.yname, properties=self.properties.copy(), copy=False)
+    
+    
+    
+    
+    def _physical(self, rows):
+        """
+        Converts indices of y-arrays into indices of the storage, which still contains the y-arrays deleted with del.
+        """
         
-        for i in range(self.length-1):
-            if i > maxlen:
-                string += ' ... ' + '|'
-                break
-            string += ' y[%d,:]'%i + spaces + '|'
-            
-        string += ' y[%d,:]\n'%(self.length-1)
+        if self._dead is None:
+            return rows
+        if isinstance(rows, (int, np.integer)):
+            if rows < 0:
+                rows += self.length
+            if rows < self._firstdead:
+                return rows
+        if self._aliverows is None:
+            self._aliverows = np.flatnonzero(~self._dead)
+        return self._aliverows[rows]
         
-        hypherlen = len(string) + spacelen
-        string += '-'*hypherlen
         
-        for i in range(self.properties_maxlen):
-            
+    
 
-            
-            string += '\n' + ' '*2 + spaces + '|'
-            
-            for j in range(self.length-1):
-                if j > maxlen:
-                    string += ' ... '  + '|'
-                    break
-                
-                if self.properties[j] == None:
-                    string += ' NoProp' + spaces + '|' 
-                else:
-                    if i >= len(self.properties[j]):
-                        string += ' NoProp' + spaces + '|'
-                    else:
-                        propstring = ' ' + str(list(self.properties[j].keys())[i]) + ':' + str(self.properties[j][list(self.properties[j].keys())[i]])
-                        string += propstring + (spacelen-len(propstring) + 7)*' ' + '|'
-            
-            
-            j = self.length-1
-            
-            if self.properties[j] == None:
-                string += ' NoProp' + spaces + '\n'
-            else:
-                if i >= len(self.properties[j]):
-                    string += ' NoProp' + spaces + '\n'
-                else:
-                    propstring = ' ' + str(list(self.properties[j].keys())[i]) + ':' + str(self.properties[j][list(self.properties[j].keys())[i]])
-                    string += propstring + (spacelen-len(propstring) + 7)*' ' + '\n'
-            
-        string += hypherlen*'-' + '\n'
+    # ******************************************************** Standard I/O *******************************************************
+    
         
-        if self.properties_maxlen == 0:
-            string += '\n'
+    def get_table_numnum(self):
         
-        xstring = ' %g'%self.x
-        string += xstring + (spacelen-len(xstring)+2)*' ' + '|'
+        """
+        Method for printing the Data in table format, if self.dtype = 'num-num' (x and y are numbers).
         
-        for i in range(self.length-1):
-            if i > maxlen:
-                string += ' ... ' + '|'
-                break
-            ystring = ' %g'%self.y[i]
-            string += ystring + (spacelen-len(ystring)+7)*' ' + '|'
+        Returns
+        -------
+        string: str
+            The Data represented in table format.
+        """
         
-        i = self.length-1 
-        ystring = ' %g'%self.y[i]
-        string += ystring + (spacelen-len(ystring)+7)*' ' + '\n'
+        spacelen = Data.PRINT_TABLE_SPACELEN
         
+        return self._render_table(self.xname, ' x', spacelen+2, [' y'], spacelen+2, [0], False, 
+                                  np.reshape(self.x, (1,)), np.reshape(self.y, (1,1)), False)
+    
+    
+    def get_table_numarr(self):
         
-        string += '-'*hypherlen
+        """
+        Method for printing the Data in table format, if self.dtype = 'num-arr' (x is a number and y is array-like).
         
-        prestring = self.xname + (spacelen-len(self.xname)+2)*' ' + '|' + self.yname+ '\n'
-        prestring += hypherlen*'-' + '\n' + hypherlen*'-' + '\n'
+        Returns
+        -------
+        string: str
+            The Data represented in table format.
+        """
         
+        spacelen = Data.PRINT_TABLE_SPACELEN
+        cols, colcut = Data._visible_indices(self.length, Data.PRINT_TABLE_MAXLEN)
         
-        return prestring + string
+        return self._render_table(self.xname, ' x', spacelen+2, [' y[%d,:]'%j for j in cols], spacelen+7, cols, colcut, 
+                                  np.reshape(self.x, (1,)), np.reshape(self.y[cols], (1,len(cols))), False)
     
     
     def get_table_arrarr(self):
@@ -440,107 +690,800 @@ class Data:
         """
         
         spacelen = Data.PRINT_TABLE_SPACELEN
-        maxlen = Data.PRINT_TABLE_MAXLEN
-        maxdepth = Data.PRINT_TABLE_MAXDEPTH
-        spaces = spacelen*' '
+        cols, colcut = Data._visible_indices(self.length, Data.PRINT_TABLE_MAXLEN)
+        samples, samplecut = Data._visible_indices(len(self.x), Data.PRINT_TABLE_MAXDEPTH)
         
+        return self._render_table(self.xname.upper(), ' x[:]', spacelen+5, [' y[%d,:]'%j for j in cols], spacelen+7, cols, colcut, 
+                                  self.x[samples], self.y[np.ix_(cols, samples)].T, samplecut, yname=self.yname.upper())
+    
+    
+    
+    
+    @staticmethod
+    def _visible_indices(n, maxshown):
+        """
+        Returns the indices of the n rows or columns shown in a table, i.e. the first maxshown+1 and the last one, and whether some are left out in between.
+        """
         
-        hypherlen = 0
+        if n > maxshown+2:
+            return list(range(maxshown+1)) + [n-1], True
+        return list(range(n)), False
+    
+    
+    
+    
+    def _render_table(self, xname, xheader, xwidth, yheaders, ywidth, cols, colcut, xvalues, yvalues, samplecut, yname=None):
+        """
+        Renders the table of the Data for the visible columns cols. xvalues are the visible x-values and yvalues the corresponding y-values of shape (len(xvalues), len(cols)). The cells of each column are formatted at once and the lines are joined only once, so the work is proportional to the number of visible cells.
+        """
         
-        string = ' x[:]' + spaces + '|'
+        if yname == None:
+            yname = self.yname
+        
+        def join(first, cells):
+            cells = list(cells)
+            if colcut:
+                cells.insert(len(cells)-1, np.full(np.shape(cells[0]), ' ... ') if np.ndim(cells[0]) else ' ... ')
+            line = first
+            for cell in cells:
+                line = np.char.add(np.char.add(line, '|'), cell)
+            return line
+        
+        lines = [str(join(xheader.ljust(xwidth), [h.ljust(ywidth) for h in yheaders]))]
+        
+        props = [self.properties[j] for j in cols]
+        props = [list(p.items()) if p != None else [] for p in props]
+        proplines = []
+        for i in range(max([0] + [len(p) for p in props])):
+            cells = [(' %s:%s'%(str(p[i][0]), str(p[i][1])) if i < len(p) else ' NoProp').ljust(ywidth) for p in props]
+            proplines.append(str(join(' '*xwidth, cells)))
+        
+        xcells = np.char.ljust(np.char.mod(' %g', np.asarray(xvalues)), xwidth)
+        ycells = np.char.ljust(np.char.mod(' %g', np.asarray(yvalues)), ywidth)
+        datalines = join(xcells, ycells.T).tolist()
+        
+        hyphens = '-'*max([len(line) for line in lines + proplines + datalines])
+        if samplecut:
+            datalines.insert(len(datalines)-1, hyphens + '\n\n' + (len(hyphens)//2-4)*' ' + '......' + '\n' + hyphens)
+        
+        table = [xname.ljust(xwidth) + '|' + yname, hyphens, hyphens] + lines + [hyphens]
+        if len(proplines) > 0:
+            table += proplines + [hyphens]
+        table += datalines + [hyphens]
+        return '\n'.join(table)
+    
+    
+    
+    
+    @classmethod
+    def open_memmap(cls, path_x, path_y, mode='r'):
+        """
+        Opens Data, which was saved with Data.save_memmap, as memory-mapped arrays. Data.x and Data.y are np.memmap objects, so the values are paged in from disk on access instead of being loaded into memory. xname, yname and properties are read from the sidecar JSON file next to path_y.
         
-        for i in range(self.length-1):
-            if i > maxlen:
-                string += ' ... ' + '|'
-                break
-            string += ' y[%d,:]'%i + spaces + '|'
-            
-        string += ' y[%d,:]\n'%(self.length-1)
+        Parameters
+        ----------
+            path_x: str
+                The file containing the x-values, either a .npy file or a raw binary file.
+                
+            path_y: str
+                The file containing the y-values, either a .npy file or a raw binary file.
+                
+            mode: str, optional
+                'r' opens the files read-only, 'r+' allows to write changes back to disk and 'c' keeps changes in memory only (copy-on-write). Default is 'r'.
+                
+        Returns
+        -------
+            data: Data
+                The memory-mapped Data.
+                
+        Raises
+        ------
+            ValueError
+                If mode is not 'r', 'r+' or 'c'.
+        """
         
-        hypherlen = len(string) + spacelen
-        string += '-'*hypherlen
+        if mode not in ('r', 'r+', 'c'):
+            raise ValueError("mode must be 'r', 'r+' or 'c'.")
         
+        with open(Data._sidecar_path(path_y), 'r') as f:
+            sidecar = json.load(f)
         
-        for i in range(self.properties_maxlen):
-            
-
-            
-            string += '\n' + ' '*5 + spaces + '|'
-            
-            for j in range(self.length-1):
-                if j > maxlen:
-                    string += ' ... '  + '|'
-                    break
-                
-                if self.properties[j] == None:
-                    string += ' NoProp' + spaces + '|' 
-                else:
-                    if i >= len(self.properties[j]):
-                        string += ' NoProp' + spaces + '|'
-                    else:
-                        propstring = ' ' + str(list(self.properties[j].keys())[i]) + ':' + str(self.properties[j][list(self.properties[j].keys())[i]])
-                        string += propstring + (spacelen-len(propstring) + 7)*' ' + '|'
-            
-            
-            j = self.length-1
-            
-            if self.properties[j] == None:
-                string += ' NoProp' + spaces + '\n'
+        arrays = []
+        for path, name in ((path_x, 'x'), (path_y, 'y')):
+            if path.endswith('.npy'):
+                arrays.append(np.load(path, mmap_mode=mode))
             else:
-                if i >= len(self.properties[j]):
-                    string += ' NoProp' + spaces + '\n'
-                else:
-                    propstring = ' ' + str(list(self.properties[j].keys())[i]) + ':' + str(self.properties[j][list(self.properties[j].keys())[i]])
-                    string += propstring + (spacelen-len(propstring) + 7)*' ' + '\n'
-            
-        string += hypherlen*'-' + '\n'
+                arrays.append(np.memmap(path, dtype=sidecar[name]['dtype'], mode=mode, shape=tuple(sidecar[name]['shape'])))
         
-        if self.properties_maxlen == 0:
-            string += '\n'
+        properties = {}
+        for key in sidecar['properties']:
+            properties[int(key)] = sidecar['properties'][key]
         
+        return cls(arrays[0], arrays[1], xname=sidecar['xname'], yname=sidecar['yname'], properties=properties, copy=False)
+    
+    
+    
+    
+    def save_memmap(self, path_x, path_y):
+        """
+        Saves the Data to disk, such that it can be opened with Data.open_memmap. Files ending with .npy are written in numpy's .npy format, all other files as raw binary. xname, yname, properties and the dtypes and shapes of x and y are written to a sidecar JSON file next to path_y. The values of properties must therefore be JSON serializable. y is written in chunks of Data.CHUNK_BYTES, so memory-mapped Data can be saved without loading it.
         
-        for i in range(len(self.x)-1):
-            
-            if i > maxdepth:
-                string += '-'*hypherlen + '\n\n' + (hypherlen//2-4)*' ' + '......' + '\n' + '-'*hypherlen + '\n'
-                break
+        Parameters
+        ----------
+            path_x: str
+                The file to write the x-values to.
+                
+            path_y: str
+                The file to write the y-values to.
+                
+        Raises
+        ------
+            ValueError
+                If Data.dtype is not 'arr-arr'.
+        """
+        
+        if self.dtype != 'arr-arr':
+            raise ValueError("Only Data with dtype 'arr-arr' can be saved as memory-mapped files.")
+        
+        for path, values in ((path_x, self.x), (path_y, self.y)):
+            if path.endswith('.npy'):
+                out = np.lib.format.open_memmap(path, mode='w+', dtype=values.dtype, shape=values.shape)
+                for rows in self._row_chunks(len(values), values[0:1].nbytes):
+                    out[rows] = values[rows]
+                out.flush()
+                del out
+            else:
+                with open(path, 'wb') as f:
+                    for rows in self._row_chunks(len(values), values[0:1].nbytes):
+                        np.ascontiguousarray(values[rows]).tofile(f)
+        
+        sidecar = {'xname': self.xname,
+                   'yname': self.yname,
+                   'properties': dict(self.properties.items()),
+                   'x': {'dtype': self.x.dtype.str, 'shape': list(self.x.shape)},
+                   'y': {'dtype': self.y.dtype.str, 'shape': list(self.y.shape)}}
+        with open(Data._sidecar_path(path_y), 'w') as f:
+            json.dump(sidecar, f)
+    
+    
+    
+    
+    def set_executor(self, executor=None, workers=None):
+        """
+        Sets the executor, which runs the numerical methods (interp_*, stat_* and norm_*) in parallel on blocks of rows of y. The blocks are processed by NumPy kernels, which release the GIL, so a thread pool scales with the number of cores. The results of the blocks are merged in the order of the rows, so they do not depend on the number of workers.
+        
+        Parameters
+        ----------
+            executor: None, int or concurrent.futures.ThreadPoolExecutor, optional
+                None runs everything in the calling thread, an int creates a thread pool with this number of workers and a ThreadPoolExecutor is used as given. A thread pool created by the Data is shut down, when it is replaced. Default is None.
+                
+            workers: int, optional
+                The number of workers of a given ThreadPoolExecutor, which sets how many blocks the rows are split into. Default is os.cpu_count().
+                
+        Raises
+        ------
+            TypeError
+                If executor is not None, an int or a ThreadPoolExecutor. Other executors, e.g. a ProcessPoolExecutor, cannot run the blocks, which are local functions.
+                
+            ValueError
+                If executor or workers is an int smaller than 1.
+        """
+        
+        if executor != None and type(executor) != int and not isinstance(executor, concurrent.futures.ThreadPoolExecutor):
+            raise TypeError("executor must be None, an int or a concurrent.futures.ThreadPoolExecutor.")
+        if type(executor) == int and executor < 1:
+            raise ValueError("The number of workers must be at least 1.")
+        if workers != None and (type(workers) != int or workers < 1):
+            raise ValueError("workers must be an int of at least 1.")
+        
+        if self._ownexecutor and self._executor is not executor:
+            self._executor.shutdown()
+        self._ownexecutor = False
+        
+        if executor == None:
+            self._executor = None
+            self._workers = 1
+        elif type(executor) == int:
+            self._executor = concurrent.futures.ThreadPoolExecutor(executor)
+            self._ownexecutor = True
+            self._workers = executor
+        else:
+            self._executor = executor
+            self._workers = workers if workers != None else (os.cpu_count() or 1)
+    
+    
+    
+    
+    def _map_chunks(self, func, chunks):
+        """
+        Applies func to every chunk of rows, using the executor set by Data.set_executor if there is more than one chunk. Returns the results in the order of the chunks. func must not access Data.y or Data.properties, which could compact the storage from a worker thread, but arrays bound before.
+        """
+        
+        chunks = list(chunks)
+        if self._executor is None or len(chunks) < 2:
+            return [func(c) for c in chunks]
+        if self._dead is not None and self._aliverows is None:
+            self._aliverows = np.flatnonzero(~self._dead)
+        return list(self._executor.map(func, chunks))
+    
+    
+    
+    
+    def _select_rows(self, index):
+        """
+        Converts the *index arguments of the stat_* methods into the selected rows of y. index may be empty (all rows), one or more ints, or a single slice, boolean mask or index array. Returns the rows as an index array (None if all rows are selected) and whether a single int was given.
+        """
+        
+        if len(index) == 0:
+            return None, False
+        
+        single = len(index) == 1 and isinstance(index[0], (int, np.integer))
+        if len(index) == 1 and isinstance(index[0], (slice, list, np.ndarray)):
+            selection = index[0]
+        else:
+            selection = list(index)
+        
+        if isinstance(selection, slice):
+            return np.arange(self.length)[selection], False
+        
+        selection = np.asarray(selection)
+        if selection.dtype == bool:
+            if selection.shape != (self.length,):
+                raise IndexError("Boolean mask of shape %s does not fit to Data with length %d."%(str(selection.shape), self.length))
+            return np.flatnonzero(selection), False
+        
+        if np.any(selection >= self.length) or np.any(selection < -self.length):
+            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
+        return selection.astype(np.intp).reshape(-1), single
+    
+    
+    
+    
+    def _y2d(self, rows=None):
+        """
+        Returns the y-arrays specified by rows (an index array, None for all rows or a slice) as a two-dimensional array, also if y is a number or one-dimensional.
+        """
+        
+        y = self._y if self._y.ndim == 2 else self._y.reshape(-1, 1)
+        if self._dead is not None:
+            rows = self._physical(np.arange(self.length) if rows is None else rows)
+        if rows is None:
+            return y
+        return y[rows]
+    
+    
+    
+    
+    def _reduce_rows(self, func, rows=None):
+        """
+        Applies the reduction func(y, axis=1) to the y-arrays specified by rows (an index array or None for all rows) in a single call per chunk of rows, so memory-mapped Data is paged in piece by piece.
+        """
+        
+        if rows is None:
+            chunks = self._map_chunks(lambda c: func(self._y2d(c), axis=1), self._row_chunks())
+        else:
+            chunks = self._map_chunks(lambda c: func(self._y2d(rows[c]), axis=1), self._row_chunks(len(rows)))
+        
+        if len(chunks) == 0:
+            return np.zeros(0)
+        return np.concatenate(chunks)
+    
+    
+    
+    
+    def _floating(self):
+        """
+        Returns the dtype of y, if it is a floating point or complex dtype, and np.float64 otherwise, i.e. the dtype y-values computed from y are stored in.
+        """
+        
+        if np.issubdtype(self._y.dtype, np.inexact):
+            return self._y.dtype
+        return np.dtype(np.float64)
+    
+    
+    
+    
+    def _accumulator(self):
+        """
+        Returns the dtype sums over y are accumulated in, np.float64 for float16 and float32 y and None (numpy's default) otherwise.
+        """
+        
+        if np.issubdtype(self._y.dtype, np.floating) and self._y.dtype.itemsize < 8:
+            return np.float64
+        return None
+    
+    
+    
+    
+    def save(self, path, compress=False, chunk_rows=None):
+        """
+        Saves the Data to a single binary file, which can be read partially with Data.load.
+        
+        The file consists of
+            - 24 bytes: the magic bytes Data.FILE_MAGIC, then the offset and the length of the header, each as little-endian uint64,
+            - the raw little-endian bytes of x,
+            - the y-arrays in chunks of chunk_rows rows each, C-ordered and little-endian, each chunk optionally compressed with zlib,
+            - the header, a UTF-8 encoded JSON object with the keys 'version', 'xname', 'yname', 'dtype' (Data.dtype), 'properties', 'x' and 'y'. 'x' and 'y' describe the arrays by 'dtype' (numpy dtype string), 'shape' and 'offset', 'y' additionally by 'chunk_rows', 'compression' (None or 'zlib') and 'chunks', a list of [offset, nbytes] per chunk.
+        The values of properties must be JSON serializable.
+        
+        Parameters
+        ----------
+            path: str
+                The file to write to.
+                
+            compress: bool, optional
+                If compress=True, each chunk of y is compressed with zlib. Default is False.
+                
+            chunk_rows: int, optional
+                The number of y-arrays per chunk. Default is None, which chooses chunks of at most Data.CHUNK_BYTES.
+        """
+        
+        x = np.asarray(self.x)
+        y = np.asarray(self.y)
+        x = x.astype(x.dtype.newbyteorder('<'), copy=False)
+        ydtype = y.dtype.newbyteorder('<')
+        
+        if chunk_rows == None:
+            chunks = list(self._row_chunks(len(y) if y.ndim else 1))
+        else:
+            chunks = [slice(start, start+chunk_rows) for start in range(0, len(y) if y.ndim else 1, chunk_rows)]
+        if y.ndim == 0:
+            y = y.reshape(1)
+        
+        header = {'version': 1, 'xname': self.xname, 'yname': self.yname, 'dtype': self.dtype,
+                  'properties': dict(self.properties.items()),
+                  'x': {'dtype': x.dtype.str, 'shape': list(x.shape), 'offset': 24},
+                  'y': {'dtype': ydtype.str, 'shape': list(np.shape(self.y)), 'chunk_rows': chunks[0].stop - chunks[0].start if len(chunks) > 0 else 1,
+                        'compression': 'zlib' if compress else None, 'chunks': []}}
+        
+        with open(path, 'wb') as f:
+            f.write(Data.FILE_MAGIC + struct.pack('<QQ', 0, 0))
+            f.write(np.ascontiguousarray(x).tobytes())
+            for c in chunks:
+                data = np.ascontiguousarray(y[c], dtype=ydtype).tobytes()
+                if compress:
+                    data = zlib.compress(data)
+                header['y']['chunks'].append([f.tell(), len(data)])
+                f.write(data)
+            
+            offset = f.tell()
+            data = json.dumps(header).encode('utf-8')
+            f.write(data)
+            f.seek(len(Data.FILE_MAGIC))
+            f.write(struct.pack('<QQ', offset, len(data)))
+    
+    
+    
+    
+    @classmethod
+    def load(cls, path, rows=None, xrange=None):
+        """
+        Loads Data saved with Data.save. Only the chunks containing the requested y-arrays are read, and of uncompressed files only the requested x-values of them.
+        
+        Parameters
+        ----------
+            path: str
+                The file to read.
+                
+            rows: int, slice, boolean mask or array-like of ints, optional
+                The y-arrays to load. Default is None, i.e. all y-arrays.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are loaded. Requires Data with dtype 'arr-arr' and sorted x. Default is None, i.e. all x-values.
+                
+        Returns
+        -------
+            data: Data
+                The loaded Data.
+                
+        Raises
+        ------
+            ValueError
+                If the file is not a Data file or if xrange is given for Data with dtype other than 'arr-arr'.
+        """
+        
+        with open(path, 'rb') as f:
+            if f.read(len(Data.FILE_MAGIC)) != Data.FILE_MAGIC:
+                raise ValueError("%s is not a file written by Data.save."%path)
+            offset, length = struct.unpack('<QQ', f.read(16))
+            f.seek(offset)
+            header = json.loads(f.read(length).decode('utf-8'))
+            
+            xinfo = header['x']
+            yinfo = header['y']
+            f.seek(xinfo['offset'])
+            xdtype = np.dtype(xinfo['dtype'])
+            x = np.frombuffer(f.read(xdtype.itemsize*int(np.prod(xinfo['shape']))), dtype=xdtype).reshape(xinfo['shape'])
+            
+            shape = yinfo['shape']
+            ydtype = np.dtype(yinfo['dtype'])
+            if len(shape) == 0:
+                y = np.frombuffer(Data._read_chunk(f, yinfo, 0), dtype=ydtype).reshape(())
+                return cls(x.copy(), y.copy(), xname=header['xname'], yname=header['yname'], properties={int(k): v for k, v in header['properties'].items()}, copy=False)
+            
+            samples = slice(None)
+            if xrange is not None:
+                if len(shape) != 2:
+                    raise ValueError("xrange can only be given for Data with dtype 'arr-arr'.")
+                samples = slice(np.searchsorted(x, xrange[0], side='left'), np.searchsorted(x, xrange[1], side='right'))
+                x = x[samples]
+            
+            selected = np.arange(shape[0])
+            if rows is not None:
+                selected = np.atleast_1d(selected[rows])
+            
+            rowbytes = ydtype.itemsize*int(np.prod(shape[1:]))
+            chunkrows = yinfo['chunk_rows']
+            parts = []
+            positions = []
+            for chunk in np.unique(selected//chunkrows):
+                position = np.nonzero(selected//chunkrows == chunk)[0]
+                positions.append(position)
+                inchunk = selected[position] - chunk*chunkrows
+                if yinfo['compression'] == None:
+                    chunkoffset = yinfo['chunks'][chunk][0]
+                    block = np.memmap(f, dtype=ydtype, mode='r', offset=chunkoffset, shape=(yinfo['chunks'][chunk][1]//max(1, rowbytes),) + tuple(shape[1:]))
+                else:
+                    block = np.frombuffer(Data._read_chunk(f, yinfo, chunk), dtype=ydtype).reshape((-1,) + tuple(shape[1:]))
+                parts.append(np.asarray(block[inchunk,samples] if len(shape) == 2 else block[inchunk]))
             
-            xstring = ' %g'%self.x[i]
-            string += xstring + (spacelen-len(xstring)+5)*' ' + '|'
+            if len(parts) > 0:
+                y = np.empty((len(selected),) + parts[0].shape[1:], dtype=ydtype)
+                y[np.concatenate(positions)] = np.concatenate(parts)
+            else:
+                y = np.zeros((0, len(x)) if len(shape) == 2 else (0,), dtype=ydtype)
+        
+        allprops = header['properties']
+        properties = {}
+        for i, row in enumerate(selected):
+            properties[i] = allprops.get(str(row))
+        
+        return cls(x.copy(), y, xname=header['xname'], yname=header['yname'], properties=properties, copy=False)
+    
+    
+    
+    
+    @staticmethod
+    def _read_chunk(f, yinfo, chunk):
+        """
+        Reads and decompresses the chunk of y with the given number from the file f written by Data.save.
+        """
+        
+        offset, nbytes = yinfo['chunks'][chunk]
+        f.seek(offset)
+        data = f.read(nbytes)
+        if yinfo['compression'] == 'zlib':
+            data = zlib.decompress(data)
+        return data
+    
+    
+    
+    
+    @classmethod
+    def read_csv(cls, path, x_col=0, delimiter=None, chunk_rows=None, dtype=np.float64, header=None, properties_from_header=False, memmap=None, xname=None, yname=None):
+        """
+        Reads Data with dtype 'arr-arr' from a CSV or TSV file, in which each line holds one x-value and the corresponding values of all y-arrays, i.e. every column except x_col becomes one y-array. The file is parsed in chunks of lines with numpy's C parser directly into a preallocated buffer, so files larger than memory can be read into a memory-mapped y.
+        
+        Parameters
+        ----------
+            path: str
+                The file to read.
+                
+            x_col: int or None, optional
+                The column containing the x-values. If x_col=None, x is the line number 0, 1, 2, ... Default is 0.
+                
+            delimiter: str, optional
+                The column delimiter. Default is None, i.e. '\\t' if the first line contains a tab and ',' otherwise.
+                
+            chunk_rows: int, optional
+                The number of lines parsed at once. Default is None, which chooses chunks of about Data.CHUNK_BYTES.
+                
+            dtype: np.float64 or np.float32, optional
+                The dtype of x and y. Default is np.float64.
+                
+            header: bool, optional
+                Whether the first line contains column names. Default is None, i.e. the first line is a header if it cannot be parsed as numbers.
+                
+            properties_from_header: bool or str, optional
+                If True, each y-array gets the property {'name': <column name>}, if a str, the column name is stored under this key instead. Requires a header. Default is False.
+                
+            memmap: str, optional
+                A .npy file to which y is written and which is then memory-mapped, such that the file does not need to fit into memory. Default is None, i.e. y is kept in memory.
+                
+            xname, yname: str, optional
+                Default is None, i.e. the name of column x_col and, if the file has only one y-column, its name, if there is a header. Otherwise 'x' and 'y'.
+                
+        Returns
+        -------
+            data: Data
+                The read Data.
+                
+        Raises
+        ------
+            ValueError
+                If a line does not contain the same number of numbers as the first data line or if properties_from_header is given for a file without header.
+        """
         
-            for j in range(self.length-1):
-                if j > maxlen:
-                    string += ' ... ' + '|'
+        with open(path, 'r') as f:
+            first = f.readline()
+            nlines = first.count('\n')
+            last = first[-1:]
+            for block in iter(lambda: f.read(Data.CHUNK_BYTES), ''):
+                nlines += block.count('\n')
+                last = block[-1]
+            if last not in ('', '\n'):
+                nlines += 1
+        
+        if delimiter == None:
+            delimiter = '\t' if '\t' in first else ','
+        names = [name.strip() for name in first.rstrip('\r\n').split(delimiter)]
+        
+        if header == None:
+            try:
+                [float(name) for name in names]
+                header = False
+            except ValueError:
+                header = True
+        if properties_from_header and not header:
+            raise ValueError("properties_from_header requires a file with a header.")
+        
+        ncols = len(names)
+        ycols = [col for col in range(ncols) if col != (x_col % ncols if x_col != None else None)]
+        if chunk_rows == None:
+            chunk_rows = max(1, Data.CHUNK_BYTES//max(1, len(first), 8*ncols))
+        
+        with open(path, 'r') as f:
+            if header:
+                f.readline()
+                nlines -= 1
+            
+            x = np.empty(nlines, dtype=dtype)
+            if memmap != None:
+                y = np.lib.format.open_memmap(memmap, mode='w+', dtype=dtype, shape=(len(ycols), nlines))
+            else:
+                y = np.empty((len(ycols), nlines), dtype=dtype)
+            
+            length = 0
+            while True:
+                text = ''.join(itertools.islice(f, chunk_rows)).replace('\r', '').strip()
+                if text == '':
                     break
-                ystring = ' %g'%self.y[j][i]
-                string += ystring + (spacelen-len(ystring)+7)*' ' + '|'
+                nrows = text.count('\n') + 1
+                if delimiter.strip() != '':
+                    text = text.replace('\n', delimiter)
+                values = np.fromstring(text, dtype=dtype, sep=delimiter)
+                if values.size != nrows*ncols:
+                    raise ValueError("Expected %d numbers in each of the lines %d to %d."%(ncols, length + header + 1, length + header + nrows))
+                values = values.reshape(-1, ncols)
+                
+                if x_col != None:
+                    x[length:length+len(values)] = values[:, x_col]
+                y[:, length:length+len(values)] = values[:, ycols].T
+                length += len(values)
+        
+        if x_col == None:
+            x = np.arange(length, dtype=dtype)
+        else:
+            x = x[:length]
+        if memmap != None:
+            y.flush()
+            y = y[:, :length]
+        elif length < y.shape[1]:
+            y = np.ascontiguousarray(y[:, :length])
+        
+        properties = {}
+        if properties_from_header:
+            key = properties_from_header if type(properties_from_header) == str else 'name'
+            for row, col in enumerate(ycols):
+                properties[row] = {key: names[col]}
+        
+        if header:
+            if xname == None and x_col != None:
+                xname = names[x_col]
+            if yname == None and len(ycols) == 1:
+                yname = names[ycols[0]]
+        
+        return cls(x, y, xname=xname, yname=yname, properties=properties, copy=False)
+    
+    
+    
+    
+    def to_csv(self, path, delimiter=',', fmt='%.17g', header=True, properties_to_header=False):
+        """
+        Writes the Data to a CSV or TSV file, which can be read with Data.read_csv. Each line holds one x-value and the corresponding values of all y-arrays, i.e. x is the first column and every y-array one further column. The lines are written in chunks of about Data.CHUNK_BYTES, each formatted with a single string operation instead of formatting every number on its own.
+        
+        Parameters
+        ----------
+            path: str
+                The file to write to.
+                
+            delimiter: str, optional
+                The column delimiter. Default is ','.
+                
+            fmt: str, optional
+                The %-format of the numbers. The default '%.17g' keeps float64 values exactly.
+                
+            header: bool, optional
+                Whether to write a first line with column names, xname for x and yname0, yname1, ... for the y-arrays. Default is True.
+                
+            properties_to_header: bool or str, optional
+                If True, the property 'name' of a y-array is used as its column name, if a str, the property with this key. y-arrays without it keep the default name. Default is False.
+                
+        Raises
+        ------
+            ValueError
+                If Data.dtype is not 'arr-arr'.
+        """
+        
+        if self.dtype != 'arr-arr':
+            raise ValueError("Only Data with dtype 'arr-arr' can be written to CSV.")
+        
+        x = self.x
+        y = self.y
+        ncols = len(y) + 1
+        
+        with open(path, 'w') as f:
+            if header:
+                names = [self.xname] + ['%s%d'%(self.yname, i) for i in range(len(y))]
+                if properties_to_header:
+                    key = properties_to_header if type(properties_to_header) == str else 'name'
+                    if key in self.properties.columns:
+                        present = self.properties.present[key][:len(y)]
+                        for i in np.nonzero(present)[0]:
+                            names[i+1] = str(self.properties.columns[key][i])
+                f.write(delimiter.join(names) + '\n')
+            
+            line = delimiter.join([fmt]*ncols) + '\n'
+            for c in self._row_chunks(len(x), y.itemsize*ncols):
+                block = np.empty((c.stop - c.start, ncols), dtype=np.result_type(x, y))
+                block[:, 0] = x[c]
+                block[:, 1:] = y[:, c].T
+                f.write((line*len(block))%tuple(block.ravel().tolist()))
+    
+    
+    
+    
+    def to_npz(self, path, compress=False):
+        """
+        Writes the Data to a .npz file with the arrays 'x', 'y', 'xname', 'yname' and 'properties', the latter a JSON string of the properties. The file can be read without pickling, e.g. with
+        
+            npz = np.load(path)
+            data = Data(npz['x'], npz['y'], xname=str(npz['xname']), yname=str(npz['yname']), properties={int(k): v for k, v in json.loads(str(npz['properties'])).items()})
+        
+        Parameters
+        ----------
+            path: str
+                The file to write to.
+                
+            compress: bool, optional
+                If compress=True, the arrays are compressed with zlib. Default is False.
+        """
+        
+        savez = np.savez_compressed if compress else np.savez
+        savez(path, x=self.x, y=self.y, xname=np.array(self.xname), yname=np.array(self.yname), properties=np.array(json.dumps(dict(self.properties.items()))))
+    
+    
+    
+    
+    def to_columns(self, path):
+        """
+        Writes the Data to the directory path in a columnar layout, which can be read with Data.read_columns. Every y-array is one contiguous column of y.npy and every property key one column of the properties table, so single y-arrays and properties can be read without reading the rest. The directory contains
+            - meta.json: xname, yname, dtype, length and the list of property keys with their dtypes,
+            - x.npy and y.npy: x and y, y written in chunks of Data.CHUNK_BYTES,
+            - isnone.npy: the mask of rows, whose properties are None,
+            - property<j>.npy and property<j>_present.npy: the values of the j-th property key and the mask of rows having it. Properties with non-numerical values are written as a JSON list property<j>.json instead.
         
-            j = self.length-1 
-            ystring = ' %g'%self.y[j][i]
-            string += ystring + (spacelen-len(ystring)+7)*' ' + '\n'
+        Parameters
+        ----------
+            path: str
+                The directory to write to. It is created, if it does not exist.
+        """
         
-        i = len(self.x)-1
+        os.makedirs(path, exist_ok=True)
         
-        xstring = ' %g'%self.x[i]
-        string += xstring + (spacelen-len(xstring)+5)*' ' + '|'
+        for name, values in (('x', self.x), ('y', self.y)):
+            out = np.lib.format.open_memmap(os.path.join(path, name + '.npy'), mode='w+', dtype=values.dtype, shape=np.shape(values))
+            if out.ndim == 0:
+                out[...] = values
+            else:
+                for rows in self._row_chunks(len(out), out[0:1].nbytes):
+                    out[rows] = values[rows]
+            out.flush()
+            del out
+        
+        table = self.properties
+        meta = {'version': 1, 'xname': self.xname, 'yname': self.yname, 'dtype': self.dtype, 'length': table.length, 'properties': []}
+        np.save(os.path.join(path, 'isnone.npy'), table.isnone[:table.length])
+        for j, name in enumerate(table.columns):
+            column = table.columns[name][:table.length]
+            present = table.present[name][:table.length]
+            np.save(os.path.join(path, 'property%d_present.npy'%j), present)
+            if column.dtype == object:
+                with open(os.path.join(path, 'property%d.json'%j), 'w') as f:
+                    json.dump([value if has else None for value, has in zip(column.tolist(), present.tolist())], f)
+                meta['properties'].append({'name': name, 'dtype': 'object'})
+            else:
+                np.save(os.path.join(path, 'property%d.npy'%j), column)
+                meta['properties'].append({'name': name, 'dtype': column.dtype.str})
         
-        for j in range(self.length-1):
-            if j > maxlen:
-                string += ' ... ' + '|'
-                break
-            ystring = ' %g'%self.y[j][i]
-            string += ystring + (spacelen-len(ystring)+7)*' ' + '|'
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+    
+    
     
-        j = self.length-1 
-        ystring = ' %g'%self.y[j][i]
-        string += ystring + (spacelen-len(ystring)+7)*' ' + '\n'
+    
+    @classmethod
+    def read_columns(cls, path, mmap_mode=None):
+        """
+        Reads Data written with Data.to_columns.
+        
+        Parameters
+        ----------
+            path: str
+                The directory to read from.
+                
+            mmap_mode: str, optional
+                If given, x and y are memory-mapped with this mode ('r', 'r+' or 'c'), see np.load. Default is None, i.e. they are loaded into memory.
+                
+        Returns
+        -------
+            data: Data
+                The read Data.
+        """
         
-        string += '-'*hypherlen
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        
+        table = PropertyTable()
+        table.length = meta['length']
+        table.capacity = meta['length']
+        table.isnone = np.load(os.path.join(path, 'isnone.npy'))
+        table.nkeys = np.zeros(table.length, dtype=np.int64)
+        for j, prop in enumerate(meta['properties']):
+            present = np.load(os.path.join(path, 'property%d_present.npy'%j))
+            if prop['dtype'] == 'object':
+                with open(os.path.join(path, 'property%d.json'%j), 'r') as f:
+                    column = np.empty(table.length, dtype=object)
+                    for i, value in enumerate(json.load(f)):
+                        column[i] = value
+            else:
+                column = np.load(os.path.join(path, 'property%d.npy'%j))
+            table.columns[prop['name']] = column
+            table.present[prop['name']] = present
+            table.nkeys += present
+        
+        x = np.load(os.path.join(path, 'x.npy'), mmap_mode=mmap_mode)
+        y = np.load(os.path.join(path, 'y.npy'), mmap_mode=mmap_mode)
+        return cls(x, y, xname=meta['xname'], yname=meta['yname'], properties=table, copy=False)
+    
+    
+    
+    
+    @staticmethod
+    def _sidecar_path(path_y):
+        """
+        Returns the path of the sidecar JSON file belonging to the y-file path_y.
+        """
+        return os.path.splitext(path_y)[0] + '.json'
+    
+    
+    
+    
+    def _row_chunks(self, length=None, rowbytes=None):
+        """
+        Yields slices along the first axis of y (or of an array with the given length and bytes per row), each covering at most Data.CHUNK_BYTES.
+        """
         
-        prestring = self.xname.upper() + (spacelen-len(self.xname)+5)*' ' + '|' + self.yname.upper() + '\n'
-        prestring += hypherlen*'-' + '\n' + hypherlen*'-' + '\n'
+        if length == None:
+            length = self.length
+        if rowbytes == None:
+            rowbytes = self._y.itemsize*(self._y.shape[1] if self._y.ndim == 2 else 1)
         
-        return prestring + string
+        step = max(1, Data.CHUNK_BYTES//max(1, rowbytes))
+        if self._workers > 1:
+            step = max(1, min(step, -(-length//self._workers)))
+        for start in range(0, length, step):
+            yield slice(start, min(start+step, length))
     
     
 
@@ -567,6 +1510,7 @@ class Data:
         
     def set_y(self, y, *index):
         
+        self._unshare()
         if type(self.y) == np.ndarray:
             if type(y) not in (np.ndarray, list):
                 raise TypeError("y must be array-like, i.e. np.ndarray or list.")
@@ -604,9 +1548,11 @@ class Data:
         if type(properties) != dict:
             raise TypeError("properties must be a dictionary.")
         
+        self._unshare()
+        
         if len(index) == 0:
             
-            existing_keys = []
+            existing_keys = set()
             for key in properties:
                 
                 if type(key) != int:
@@ -616,15 +1562,15 @@ class Data:
                 if key >= self.length:
                     raise IndexError("The key  %d in properties is out of range for Data with length %d."%(key, self.length))
                 
-                existing_keys.append(key)
+                existing_keys.add(key)
             
                 self.properties[key] = properties[key]
-                if len(properties[key]) > self.properties_maxlen:
-                    self.properties_maxlen = len(properties[key])
             
             for i in range(self.length):
                 if i not in existing_keys:
                     self.properties[i] = None
+            
+            self.properties_maxlen = self.properties.maxlen()
         
         else:
             
@@ -659,7 +1605,19 @@ class Data:
             x: number or numpy array
                 The x-values in Data.
         """
-        return x
+        return self.x
+    
+    
+    def get_xgrid(self):
+        """
+        Get the uniform grid of the x-values of the Data.
+        
+        Returns
+        -------
+            grid: tuple or None
+                (start, step, n), if Data.x is stored as the uniform grid start + i*step for i = 0, ..., n-1, None otherwise.
+        """
+        return self._grid
 
     
     def get_y(self, *index):
@@ -703,8 +1661,8 @@ class Data:
         
         Returns
         -------
-            props: dict of int-dict pairs
-                The properties for th columns in Data specified by *index. If *index is not specified, the whole proeprties-dict is returned.
+            props: dict of int-dict pairs or PropertyTable
+                The properties for th columns in Data specified by *index. If *index is not specified, the whole PropertyTable Data.properties is returned, which behaves like a dict of int-dict pairs.
         """
         
         if np.any(np.array(index) > self.length-1):
@@ -717,33 +1675,194 @@ class Data:
             p[i] = self.properties[i]
         return p
     
-    def get_xname(self):
-        return self.xname
-    
-    def get_yname(self):
-        return self.yname
-    
-    
-    # ******************************************************** Appending *******************************************************
-
-
-    def append(self, y, properties=[], axis=0):
+    def select(self, as_data=False, **criteria):
         """
-        Appends y to the data along the specified axis. It uses the methods Data.append_numnum_numarr and Data.append_arrarr.
+        Find the columns whose properties equal all given criteria, e.g. data.select(temperature=300). The lookup uses hash indexes of the properties, which are built on first use.
         
         Parameters
         ----------
-            y: number or array-like
-                Values to append to the Data.y (axis=0) or Data.x and Data.y (axis=0)
-                
-            properties: list of dicts, optional
-                Properties for the new y-columns (axis=0) or new properties for y-columns (axis=1). Default is [].
+            as_data: bool, optional
+                If as_data=False, the indices of the matching columns are returned, otherwise a new Data containing them. Default is False.
                 
-            axis: int, optional
-                Axis along which the values shall be appended. axis=0 means, that new y columns are appended, for axis=1 new rows are created. Default is 0.
-        """
+            **criteria: property keys and values
+                The required values of the properties.
         
-        if self.dtype == 'num-num' or self.dtype == 'num_arr':
+        Returns
+        -------
+            rows: numpy array or Data
+                The indices of the matching columns in ascending order, or a Data containing them (if as_data=True).
+        """
+        
+        rows = None
+        for key in criteria:
+            found = self.properties.find(key, '==', criteria[key])
+            rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+        if rows is None:
+            rows = np.arange(self.length)
+        return self._take_rows(rows) if as_data else rows
+    
+    
+    def where(self, key, op, value, as_data=False):
+        """
+        Find the columns whose property key compares to value as specified by op, e.g. data.where('temperature', '>=', 300). Range comparisons use sorted indexes of the properties, which are built on first use.
+        
+        Parameters
+        ----------
+            key: hashable
+                The key of the property.
+                
+            op: str
+                One of '==', '!=', '<', '<=', '>' and '>='. Columns without the property never match.
+                
+            value: object
+                The value to compare with.
+                
+            as_data: bool, optional
+                If as_data=False, the indices of the matching columns are returned, otherwise a new Data containing them. Default is False.
+        
+        Returns
+        -------
+            rows: numpy array or Data
+                The indices of the matching columns in ascending order, or a Data containing them (if as_data=True).
+        """
+        
+        rows = self.properties.find(key, op, value)
+        return self._take_rows(rows) if as_data else rows
+    
+    
+    def _take_rows(self, rows):
+        """
+        Returns a new Data with the columns rows, sharing x with this Data.
+        """
+        return Data(self.x, self.y[rows], xname=self.xname, yname=self.yname, properties=self.properties.take(rows), copy=False)
+    
+    
+    
+    
+    def xslice(self, xmin, xmax):
+        """
+        Restricts the Data to the x-values xmin <= x <= xmax. The range is found by a binary search in the sorted x, or arithmetically in O(1) for a uniform grid, and only the x-values of the range are copied: the returned Data is a view, whose y is a slice of Data.y and whose properties are a view of the PropertyTable. Like the views returned by Data.__getitem__, the storage is copied on write, i.e. before the view or the Data is changed by __setitem__, set_y, set_properties, interp_* or norm_*.
+        
+        Parameters
+        ----------
+            xmin, xmax: number
+                The bounds of the x-range.
+                
+        Returns
+        -------
+            data: Data
+                The view of the x-range.
+                
+        Raises
+        ------
+            ValueError
+                If Data.dtype is not 'arr-arr' or there is no x-value in the range.
+        """
+        
+        window = self._xwindow(xmin, xmax)
+        if window.stop <= window.start:
+            raise ValueError("There is no x-value in the range [%g, %g]."%(xmin, xmax))
+        
+        y = self.y
+        view = self._share(y[:,window], self._properties.view(slice(None)))
+        if self._x is not None:
+            view.x = self._x[window]
+        else:
+            view.x = self._grid[0] + np.arange(window.start, window.stop)*self._grid[1]
+        view.xshape = view._x.shape
+        return view
+    
+    
+    
+    
+    def at(self, x):
+        """
+        Returns the y-values at the x-value nearest to x as a view, i.e. Data with dtype 'num-arr', whose y is a column of Data.y and whose properties are a view of the PropertyTable. The storage is copied on write, see Data.xslice. The x-value is found by a binary search in the sorted x, or arithmetically in O(1) for a uniform grid.
+        
+        Parameters
+        ----------
+            x: number
+                The x-value.
+                
+        Returns
+        -------
+            data: Data
+                The view of the y-values at x.
+                
+        Raises
+        ------
+            ValueError
+                If Data.dtype is not 'arr-arr'.
+        """
+        
+        if self.dtype != 'arr-arr':
+            raise ValueError("Only Data with dtype 'arr-arr' can be evaluated at an x-value.")
+        
+        n = self.xshape[0]
+        i = int(np.clip(self._xsearch(x), 1, n-1)) if n > 1 else 0
+        if n > 1 and abs(self._xvalue(i-1) - x) <= abs(self._xvalue(i) - x):
+            i -= 1
+        y = self.y
+        view = self._share(y[:,i], self._properties.view(slice(None)))
+        view.x = np.array(self._xvalue(i))
+        view.xshape = ()
+        view.dtype = 'num-arr'
+        return view
+    
+    
+    
+    
+    def _xwindow(self, xmin, xmax):
+        """
+        Returns the slice of the x-values xmin <= x <= xmax.
+        """
+        
+        if self.dtype != 'arr-arr':
+            raise ValueError("Only Data with dtype 'arr-arr' can be restricted to an x-range.")
+        return slice(int(self._xsearch(xmin, 'left')), int(self._xsearch(xmax, 'right')))
+    
+    
+    
+    
+    def _xvalue(self, i):
+        """
+        Returns the x-value with index i without computing a uniform grid.
+        """
+        
+        if self._grid is None:
+            return self.x[i]
+        return self._grid[0] + i*self._grid[1]
+    
+    
+    
+    
+    def get_xname(self):
+        return self.xname
+    
+    def get_yname(self):
+        return self.yname
+    
+    
+    # ******************************************************** Appending *******************************************************
+
+
+    def append(self, y, properties=[], axis=0):
+        """
+        Appends y to the data along the specified axis. It uses the methods Data.append_numnum_numarr and Data.append_arrarr.
+        
+        Parameters
+        ----------
+            y: number or array-like
+                Values to append to the Data.y (axis=0) or Data.x and Data.y (axis=0)
+                
+            properties: list of dicts, optional
+                Properties for the new y-columns (axis=0) or new properties for y-columns (axis=1). Default is [].
+                
+            axis: int, optional
+                Axis along which the values shall be appended. axis=0 means, that new y columns are appended, for axis=1 new rows are created. Default is 0.
+        """
+        
+        if self.dtype == 'num-num' or self.dtype == 'num-arr':
             self.append_numnum_numarr(y, properties=properties, axis=axis)
         elif self.dtype == 'arr-arr':
             self.append_arrarr(y, properties=properties, axis=axis)
@@ -793,7 +1912,11 @@ class Data:
                 raise TypeError("y must be a number or one-dimensional array-like.")
                 
             
-            self.y = np.append(self.y, y)
+            if self.dtype == 'num-num':
+                self.y = np.append(self.y, np.asarray(y, dtype=self._storagedtype))
+                self.yshape = self.y.shape
+            else:
+                self._buffer_append('y', np.array(y).reshape(-1), axis=0)
             proplen = self.length-1
             
             for i in range(len(properties)):
@@ -825,8 +1948,10 @@ class Data:
                     if y.shape[1] != self.length+1:
                         raise ValueError("Second axis of y must be of length %d, but has length %d."%(y.shape[1], self.length+1))
                     
-                    self.y = np.append(self.y.reshape(self.length,1), y[:,1::], axis=1)
-                    self.x = np.append(self.x, y[:,0])
+                    self.y = self.y.reshape(self.length,1)
+                    self.x = self.x.reshape(1)
+                    self._buffer_append('y', y[:,1::].T, axis=1)
+                    self._buffer_append('x', y[:,0], axis=0)
                     
                     
                 elif len(y.shape) == 1:
@@ -834,8 +1959,10 @@ class Data:
                         raise ValueError("First axis of y must be of length %d, but has length %d."%(y.shape[0], self.length+1))
                     
                     
-                    self.y = np.append(self.y.reshape(self.length,1), y[1::].reshape(self.length, 1), axis=1)
-                    self.x = np.append(self.x, y[0])
+                    self.y = self.y.reshape(self.length,1)
+                    self.x = self.x.reshape(1)
+                    self._buffer_append('y', y[1::].reshape(self.length, 1), axis=1)
+                    self._buffer_append('x', y[0:1], axis=0)
                     
                 else:
                     raise ValueError("y must have shape (%d,) or (*,%d), but is of shape %s."%(self.length+1, self.length+1, str(y.shape)))
@@ -902,24 +2029,24 @@ class Data:
                 if len(properties) > y.shape[0]:
                     raise ValueError("properties must not contain more than %d dicts."%y.shape[0])
                 
-                if y.shape[1] != len(self.x):
-                    raise ValueError("The second axis of y must have length %d, but has length %d."%(len(self.x), y.shape[1]))
+                if y.shape[1] != self.xshape[0]:
+                    raise ValueError("The second axis of y must have length %d, but has length %d."%(self.xshape[0], y.shape[1]))
                 
-                self.y = np.append(self.y, y, axis=0)
+                self._buffer_append('y', y, axis=0)
                 
             elif len(y.shape) == 1:
                 if len(properties) > 1:
                     raise ValueError("properties must have length 0 or 1, but has length %d."%(len(properties)))
                 
                 
-                if y.shape[0] != len(self.x):
-                    raise ValueError("y must have length %d, but has length %d."%(len(self.x), y.shape[0]))
+                if y.shape[0] != self.xshape[0]:
+                    raise ValueError("y must have length %d, but has length %d."%(self.xshape[0], y.shape[0]))
                 
                 
-                self.y = np.append(self.y, y.reshape(1, len(self.x)), axis=0)
+                self._buffer_append('y', y.reshape(1, self.xshape[0]), axis=0)
                 
             else:
-                raise ValueError("y must be of shape (%d,) or (*,%d), but has shape %s."%(len(self.x), len(self.x), str(y.shape)))
+                raise ValueError("y must be of shape (%d,) or (*,%d), but has shape %s."%(self.xshape[0], self.xshape[0], str(y.shape)))
             
             proplen = self.length-1
             for i in range(len(properties)):
@@ -931,7 +2058,7 @@ class Data:
                 proplen = self.length + i
                 
             if len(y.shape) == 2:
-                self.length += self.y.shape[1]
+                self.length += y.shape[0]
             else:
                 self.length += 1
             
@@ -951,8 +2078,8 @@ class Data:
                     raise ValueError("The second axis of y must have length %d, but has length %d."%(self.length+1, y.shape[1]))
                 
                 
-                self.y = np.append(self.y, y[:,1::], axis=1)
-                self.x = np.append(self.x, y[:,0])
+                self._buffer_append('y', y[:,1::].T, axis=1)
+                self._buffer_append('x', y[:,0], axis=0)
                 
             elif len(y.shape) == 1:
                 
@@ -960,8 +2087,8 @@ class Data:
                     raise ValueError("y must have length %d, but has length %d."%(self.length+1, y.shape[0]))
                 
                 
-                self.y = np.append(self.y, y[1::].reshape(self.length, 1), axis=1)
-                self.x = np.append(self.x, y[0])
+                self._buffer_append('y', y[1::].reshape(self.length, 1), axis=1)
+                self._buffer_append('x', y[0:1], axis=0)
                 
             else:
                 raise ValueError("y must be of shape (%d,) or (*,%d), but has shape %s."%(self.length+1, self.length+1, str(y.shape)))
@@ -979,6 +2106,139 @@ class Data:
             
         else:
             raise ValueError("axis must be 0 or 1.")
+
+            
+            
+            
+    def reserve(self, n_rows=None, n_samples=None):
+        """
+        Reserves storage for at least n_rows y-arrays with n_samples values each, such that subsequent appends up to this size do not reallocate the data.
+        
+        Parameters
+        ----------
+            n_rows: int, optional
+                The number of y-arrays (first axis of y) to reserve storage for. Default is None, which keeps the current capacity.
+                
+            n_samples: int, optional
+                The number of x-values (second axis of y) to reserve storage for. Default is None, which keeps the current capacity. Only allowed if Data.dtype='arr-arr'.
+                
+        
+        Raises
+        ------
+            ValueError
+                If Data.dtype='num-num' or if n_samples is given and Data.dtype is not 'arr-arr'.
+        """
+        
+        if self.dtype == 'num-num':
+            raise ValueError("Cannot reserve storage for Data with dtype 'num-num'.")
+        if n_samples != None and self.dtype != 'arr-arr':
+            raise ValueError("n_samples can only be reserved for Data with dtype 'arr-arr'.")
+        
+        ycapacity = list(self._buffer('y').shape)
+        if n_rows != None:
+            ycapacity[0] = max(ycapacity[0], n_rows)
+        if n_samples != None:
+            ycapacity[1] = max(ycapacity[1], n_samples)
+            if self._x is not None:
+                grid = self._grid
+                self._buffer_resize('x', (max(self._buffer('x').shape[0], n_samples),), self.x.dtype)
+                self._grid = grid
+        self._buffer_resize('y', tuple(ycapacity), self.y.dtype)
+    
+    
+    
+    
+    def shrink_to_fit(self):
+        """
+        Releases the storage reserved by Data.reserve or by appending, which is not occupied by x- and y-values.
+        """
+        
+        grid = self._grid
+        for name in ('x', 'y'):
+            if name == 'x' and self._x is None:
+                continue
+            values = getattr(self, name)
+            if values.shape != ():
+                buf = np.array(values)
+                setattr(self, '_%sbuf'%name, buf)
+                setattr(self, name, buf[...])
+        self._grid = grid
+    
+    
+    
+    
+    def _buffer(self, name):
+        """
+        Returns the growable buffer behind Data.x (name='x') or Data.y (name='y'). If the array has been replaced since the last append, it becomes the new buffer.
+        """
+        
+        values = getattr(self, name)
+        buf = getattr(self, '_%sbuf'%name)
+        if buf is None or values.base is not buf or values.ndim != buf.ndim or values.strides != buf.strides or values.ctypes.data != buf.ctypes.data:
+            buf = values
+            setattr(self, '_%sbuf'%name, buf)
+        return buf
+    
+    
+    
+    
+    def _buffer_resize(self, name, capacity, dtype):
+        """
+        Moves Data.x (name='x') or Data.y (name='y') into a new buffer with the given capacity and dtype, if the current buffer is too small or has another dtype.
+        """
+        
+        values = getattr(self, name)
+        buf = self._buffer(name)
+        if buf.ndim == len(capacity) and buf.dtype == dtype and all(c <= b for c, b in zip(capacity, buf.shape)):
+            return
+        
+        buf = np.empty(capacity, dtype=dtype)
+        region = tuple(slice(0, n) for n in values.shape)
+        buf[region] = values
+        setattr(self, '_%sbuf'%name, buf)
+        setattr(self, name, buf[region])
+    
+    
+    
+    
+    def _buffer_append(self, name, values, axis=0):
+        """
+        Appends values to Data.x (name='x') or Data.y (name='y') along axis. The array is a view of a buffer whose capacity grows geometrically by Data.BUFFER_GROWTH, so appending costs amortized O(len(values)) instead of copying the whole array. x-values continuing a uniform grid exactly extend the grid, and if x is stored as grid only, nothing else. y-values are converted to the storage_dtype given to Data.__init__.
+        """
+        
+        if name == 'y' and self._storagedtype is not None:
+            values = values.astype(self._storagedtype, copy=False)
+        
+        grid = None
+        if name == 'x' and self._grid is not None:
+            start, step, n = self._grid
+            if np.array_equal(values, start + np.arange(n, n+len(values))*step):
+                grid = (start, step, n+len(values))
+                if self._x is None:
+                    self._grid = grid
+                    self.xshape = grid[2:]
+                    return
+        
+        current = getattr(self, name)
+        buf = self._buffer(name)
+        
+        shape = list(current.shape)
+        shape[axis] += values.shape[axis]
+        
+        capacity = [max(n, b) for n, b in zip(shape, buf.shape)]
+        if shape[axis] > buf.shape[axis]:
+            capacity[axis] = max(shape[axis], int(buf.shape[axis]*Data.BUFFER_GROWTH))
+        self._buffer_resize(name, tuple(capacity), np.result_type(current, values))
+        buf = getattr(self, '_%sbuf'%name)
+        
+        region = [slice(0, n) for n in shape]
+        region[axis] = slice(current.shape[axis], shape[axis])
+        buf[tuple(region)] = values
+        
+        setattr(self, name, buf[tuple(slice(0, n) for n in shape)])
+        setattr(self, '%sshape'%name, tuple(shape))
+        if grid != None:
+            self._grid = grid
             
             
             
@@ -987,95 +2247,250 @@ class Data:
             
     # ******************************************************** Numerical Manupulations *******************************************************
     
-    def interp_nan(self, *index):
+    def interp_nan(self, *index, xrange=None):
         """
         Interpolate out nans in the Data. The columns indícated by *index will be interpolated. If *index is not specified, all columns will be interpolated.
         
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The columns to be treated.
+                
+            xrange: tuple of two numbers, optional
+                Only the values at xrange[0] <= x <= xrange[1] are treated, interpolating between valid values in this range, see Data.xslice. Default is None, i.e. all x-values.
             
         Raises
         ------
-            ValueError
+            IndexError
                 If an index is not smaller than Data.length.
         
         """
         
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
-        
-        if len(index) == 0:
-            for i in range(self.length):
-                barray = ~np.isnan(self.y[i,:])
-                self.y[i,:] = np.interp(self.x, self.x[barray], self.y[i,barray])
-        else:
-            for i in range(index):
-                if i >= self.length:
-                    raise ValueError("At least one index is out of range for Data with length %d."%self.length)
-                barray = ~np.isnan(self.y[i,:])
-                self.y[i,:] = np.interp(self.x, self.x[barray], self.y[i,barray])
+        self.interp_invalid('nan', *index, xrange=xrange)
                 
                 
                 
-    def interp_nonpositive(self, *index):
+    def interp_nonpositive(self, *index, xrange=None):
         """
         Interpolate out nonpositive numbers (<= 0) in the Data. The columns indícated by *index will be interpolated. If *index is not specified, all columns will be interpolated.
         
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The columns to be treated.
+                
+            xrange: tuple of two numbers, optional
+                Only the values at xrange[0] <= x <= xrange[1] are treated, interpolating between valid values in this range, see Data.xslice. Default is None, i.e. all x-values.
             
         Raises
         ------
-            ValueError
+            IndexError
                 If an index is not smaller than Data.length.
         
         """
         
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
+        self.interp_invalid('nonpositive', *index, xrange=xrange)
         
-        if len(index) == 0:
-            for i in range(self.length):
-                barray = self.y[i,:] > 0
-                self.y[i,:] = np.interp(self.x, self.x[barray], self.y[i,barray])
-        else:
-            for i in index:
-                if i >= self.length:
-                    raise ValueError("At least one index is out of range for Data with length %d."%self.length)
-                barray = self.y[i,:] > 0
-                self.y[i,:] = np.interp(self.x, self.x[barray], self.y[i,barray])
+        
+        
+    def interp_invalid(self, invalid, *index, xrange=None):
+        """
+        Interpolate out invalid values in the Data. The columns indícated by *index will be interpolated. If *index is not specified, all columns will be interpolated. The gaps of a whole chunk of columns are found at once and only the invalid values are interpolated linearly between their valid neighbours (values outside the valid range are set to the nearest valid value, as np.interp does). Columns without gaps are skipped.
+        
+        
+        Parameters
+        ----------
+            invalid: str or callable
+                'nan' for nans, 'nonpositive' for numbers <= 0 (and nans) or a function, which takes a two-dimensional array of y-values and returns a boolean array, which is True for invalid values.
+                
+            *index: zero or more ints, or a single slice, boolean mask or index array.
+                The columns to be treated.
+                
+            xrange: tuple of two numbers, optional
+                Only the values at xrange[0] <= x <= xrange[1] are treated, interpolating between valid values in this range, see Data.xslice. Default is None, i.e. all x-values.
+            
+        Raises
+        ------
+            TypeError
+                If invalid is neither 'nan', 'nonpositive' nor callable.
+                
+            IndexError
+                If an index is not smaller than Data.length.
+                
+            ValueError
+                If a column to be treated has no valid value at all.
+        
+        """
+        
+        self._unshare()
+        x = self._xgrid()
+        window = slice(0, self.xshape[0] if self.dtype == 'arr-arr' else 1)
+        if xrange is not None:
+            window = self._xwindow(*xrange)
+            if window.stop <= window.start:
+                raise ValueError("There is no x-value in the range [%g, %g]."%tuple(xrange))
+            x = x[window] if type(x) != tuple else (x[0] + window.start*x[1], x[1], window.stop - window.start)
+        
+        if invalid == 'nan':
+            invalid = np.isnan
+        elif invalid == 'nonpositive':
+            invalid = lambda y: ~(y > 0)
+        elif not callable(invalid):
+            raise TypeError("invalid must be 'nan', 'nonpositive' or callable.")
+        
+        rows = self._select_rows(index)[0]
+        if rows is None:
+            rows = np.arange(self.length)
+        
+        y = self.y
+        
+        def fill(c):
+            block = y[rows[c], window]
+            mask = np.asarray(invalid(block), dtype=bool)
+            gaps = np.flatnonzero(mask.any(axis=1))
+            if len(gaps) == 0:
+                return
+            
+            gaprows, gapcols, values = Data._fill_gaps(x, block[gaps], mask[gaps])
+            y[rows[c][gaps][gaprows], window.start + gapcols] = values
+        
+        self._map_chunks(fill, self._row_chunks(len(rows)))
+    
+    
+    
+    @staticmethod
+    def _fill_gaps(x, block, mask):
+        """
+        Linearly interpolates the values of the two-dimensional array block, where mask is True, between the nearest valid values of the same row. x is an array or a uniform grid (start, step, n), for which the weights follow from the column indices alone. Returns the row and column indices of the interpolated values and the values.
+        """
+        
+        n = block.shape[1]
+        positions = np.arange(n)
+        previous = np.maximum.accumulate(np.where(mask, -1, positions), axis=1)
+        following = np.minimum.accumulate(np.where(mask, n, positions)[:,::-1], axis=1)[:,::-1]
+        if np.any(previous[:,-1] == -1):
+            raise ValueError("Cannot interpolate a column of Data without any valid value.")
+        
+        gaprows, gapcols = np.nonzero(mask)
+        left = previous[gaprows, gapcols]
+        right = following[gaprows, gapcols]
+        left = np.where(left < 0, right, left)
+        right = np.where(right >= n, left, right)
+        
+        y0 = block[gaprows, left]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if type(x) == tuple:
+                weight = np.where(right != left, (gapcols - left)/(right - left), 0)
+            else:
+                weight = np.where(right != left, (x[gapcols] - x[left])/(x[right] - x[left]), 0)
+        
+        return gaprows, gapcols, y0 + weight*(block[gaprows, right] - y0)
                 
                 
-    def interp_to(self, x):
+    def interp_to(self, x, method='linear', out=None, xrange=None):
         """
-        Interpolate the Data to array or number x. The x- and y-values will be resetted.
+        Interpolate the Data to array or number x. The x- and y-values will be resetted. As all columns share the same x-values, the positions of the new x-values between the old ones and the interpolation weights are computed only once and are then applied to all columns at once.
         
         
         Parameters
         ----------
             x: number or array-like.
                 The new x-value(s).
+                
+            method: str, optional
+                'linear' for linear interpolation, 'nearest' for the value at the nearest x-value, 'previous' for the value at the next smaller x-value or 'cubic' for cubic Hermite interpolation with slopes from finite differences. New x-values outside the range of Data.x get the value at the nearest edge. Default is 'linear'.
+                
+            out: numpy array, optional
+                A preallocated array of shape (Data.length, len(x)), which the interpolated y-values are written to and which becomes Data.y. Default is None.
+                
+            xrange: tuple of two numbers, optional
+                Only the values at xrange[0] <= x <= xrange[1] are interpolated from, see Data.xslice. Default is None, i.e. all x-values.
             
         Raises
         ------
             TypeError
                 If x is not a number or not array-like.
+                
+            ValueError
+                If Data.dtype is not 'arr-arr', if method is unknown or if out has the wrong shape.
         
         """
         if type(x) not in (int, float, list, np.ndarray):
             raise TypeError("x must be a number (int/float) or array-like.")
+        if self.dtype != 'arr-arr':
+            raise ValueError("Only Data with dtype 'arr-arr' can be interpolated.")
         
-        newy = np.zeros((self.length, len(x)))
-        for i in range(self.length):
-            newy[i,:] = np.interp(x, self.x, self.y[i,:])
-        self.x = x
-        self.y = newy
+        source = self if xrange is None else self.xslice(*xrange)
+        x = np.array(x)
+        terms = Data._interp_weights(source._xgrid(), x.reshape(-1), method)
+        
+        if out is None:
+            out = np.empty((self.length, x.size), dtype=self._floating())
+        elif out.shape != (self.length, x.size):
+            raise ValueError("out must be of shape (%d, %d), but has shape %s."%(self.length, x.size, str(out.shape)))
+        terms = [(indices, weights.astype(out.dtype)) for indices, weights in terms]
+        
+        sourcey = source.y
+        
+        def interpolate(c):
+            block = sourcey[c]
+            indices, weights = terms[0]
+            np.multiply(block[:,indices], weights, out=out[c])
+            for indices, weights in terms[1:]:
+                out[c] += block[:,indices]*weights
+        
+        self._map_chunks(interpolate, self._row_chunks())
+        
+        if x.shape == ():
+            out = out.reshape(self.length)
+            self.dtype = 'num-arr'
+        self._store_x(x)
+        self.y = out
+        self.xshape = x.shape
+        self.yshape = self.y.shape
+        
+        
+        
+    @staticmethod
+    def _interp_weights(xold, xnew, method):
+        """
+        Computes the interpolation from the sorted x-values xold (an array or a uniform grid (start, step, n)) to xnew as a list of (indices, weights) pairs, such that the interpolated values are the sum of y[:,indices]*weights over all pairs.
+        """
+        
+        if method not in ('linear', 'nearest', 'previous', 'cubic'):
+            raise ValueError("method must be 'linear', 'nearest', 'previous' or 'cubic'.")
+        if type(xold) == tuple:
+            n = xold[2]
+            right = Data._grid_search(xold, xnew, side='right')
+            start, step = xold[0], xold[1]
+            xold = lambda i: start + i*step
+        else:
+            n = len(xold)
+            right = np.searchsorted(xold, xnew, side='right')
+            xold = xold.__getitem__
+        if n == 1:
+            return [(np.zeros(len(xnew), dtype=np.intp), np.ones(len(xnew)))]
+        
+        if method == 'previous':
+            return [(np.clip(right-1, 0, n-1), np.ones(len(xnew)))]
+        
+        i = np.clip(right-1, 0, n-2)
+        dx = xold(i+1) - xold(i)
+        t = np.clip((xnew - xold(i))/dx, 0, 1)
+        
+        if method == 'linear':
+            return [(i, 1-t), (i+1, t)]
+        
+        if method == 'nearest':
+            return [(np.where(t < 0.5, i, i+1), np.ones(len(xnew)))]
+        
+        lower = np.maximum(i-1, 0)
+        upper = np.minimum(i+2, n-1)
+        slope0 = (t**3 - 2*t**2 + t)*dx/(xold(i+1) - xold(lower))
+        slope1 = (t**3 - t**2)*dx/(xold(upper) - xold(i))
+        return [(i, 2*t**3 - 3*t**2 + 1 - slope1), (i+1, -2*t**3 + 3*t**2 + slope0), (lower, -slope0), (upper, slope1)]
         
         
         
@@ -1083,16 +2498,38 @@ class Data:
         """
         Normalize the data with respect to the maximum value.
         """
+        self._unshare()
         maxval = self.stat_max(glob=True)
-        self.y /= maxval
+        if self._floating() != self._y.dtype:
+            self.y = self.y.astype(self._floating())
+        y = self.y
+        if self.dtype == 'num-num':
+            y /= maxval
+            return
+        
+        def divide(c):
+            y[c] /= maxval
+        
+        self._map_chunks(divide, self._row_chunks())
         
 
     def norm_min(self):
         """
         Normalize the data with respect to the maximum value.
         """
+        self._unshare()
         minval = self.stat_min(glob=True)
-        self.y /= minval
+        if self._floating() != self._y.dtype:
+            self.y = self.y.astype(self._floating())
+        y = self.y
+        if self.dtype == 'num-num':
+            y /= minval
+            return
+        
+        def divide(c):
+            y[c] /= minval
+        
+        self._map_chunks(divide, self._row_chunks())
         
             
             
@@ -1102,17 +2539,20 @@ class Data:
 
     # ******************************************************** Statistics *******************************************************
 
-    def stat_max(self, *index, glob=False):
+    def stat_max(self, *index, glob=False, xrange=None):
         """
         Find the maxima of the columns specified by *index or among the specified *index (if glob=True).
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the maxima shall be found.
                 
             glob: bool, optional
                 If glob=False an array containing the maximum values of the columns specified by *index is returned. Otherwise the maximum among those columns is returned.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1126,49 +2566,35 @@ class Data:
                 If an index is not smaller than Data.length.
         """
         
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
-        
-        if len(index) == 0:
-            if glob:
-                return self.y.max()
-            else:
-                return self.y.max(axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_max(*index, glob=glob)
         
-        elif len(index) == 1:
-            return self.y[index[0],:].max()
+        rows, single = self._select_rows(index)
+        maxima = self._reduce_rows(np.max, rows)
         
+        if single:
+            return maxima[0]
+        elif glob:
+            return maxima.max()
         else:
-            maxima = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                    maxima[count] = self.y
-                elif len(self.y.shape) == 1:
-                    maxima[count] = self.y[i].max()
-                else:
-                    maxima[count] = self.y[i,:].max()
-                count += 1
-            if glob:
-                return maxima.max()
-            else:
-                return maxima
-            
-            
-            
-        
-
-    def stat_min(self, *index, glob=False):
-        """
-        Find the minima of the columns specified by *index.
+            return maxima
+    
+    
+    
+    def stat_min(self, *index, glob=False, xrange=None):
+        """
+        Find the minima of the columns specified by *index.
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the minima shall be found.
                 
             glob: bool, optional
                 If glob=False an array containing the minimum values of the columns specified by *index is returned. Otherwise the minimum among those columns is returned.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1181,45 +2607,33 @@ class Data:
             ValueError
                 If an index is not smaller than Data.length.
         """
-
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
         
-        if len(index) == 0:
-            if glob:
-                return self.y.min()
-            else:
-                return self.y.min(axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_min(*index, glob=glob)
         
-        elif len(index) == 1:
-            return self.y[index[0],:].min()
+        rows, single = self._select_rows(index)
+        minima = self._reduce_rows(np.min, rows)
         
+        if single:
+            return minima[0]
+        elif glob:
+            return minima.min()
         else:
-            minima = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                    minima[count] = self.y
-                elif len(self.y.shape) == 1:
-                    minima[count] = self.y[i].min()
-                else:
-                    minima[count] = self.y[i,:].min()
-                count += 1
-            if glob:
-                return minima.min()
-            else:
-                return minima
-        
-        
-        
-    def stat_mean(self, *index, glob=False):
+            return minima
+    
+    
+    
+    def stat_mean(self, *index, glob=False, xrange=None):
         """
         Find the means of the columns specified by *index.
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the means shall be found.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1235,46 +2649,33 @@ class Data:
             ValueError
                 If an index is not smaller than Data.length.
         """
-
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
         
-        if len(index) == 0:
-            if glob:
-                return np.mean(self.y)
-            else:
-                return np.mean(self.y, axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_mean(*index, glob=glob)
         
-        elif len(index) == 1:
-            return np.mean(self.y[index[0],:])
+        rows, single = self._select_rows(index)
+        means = self._reduce_rows(lambda b, axis: np.mean(b, axis=axis, dtype=self._accumulator()), rows)
         
+        if single:
+            return means[0]
+        elif glob:
+            return np.mean(means)
         else:
-            means = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                    means[count] = self.y
-                elif len(self.y.shape) == 1:
-                    means[count] = np.mean(self.y[i])
-                else:
-                    means[count] = np.mean(self.y[i,:])
-                count += 1
-            if glob:
-                return np.mean(means)
-            else:
-                return means
-        
-        
-        
-        
-    def stat_median(self, *index, glob=False):
+            return means
+    
+    
+    
+    def stat_median(self, *index, glob=False, xrange=None):
         """
         Find the medians of the columns specified by *index.
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the medians shall be found.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1289,48 +2690,36 @@ class Data:
             ValueError
                 If an index is not smaller than Data.length.
         """
-
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
         
-        if len(index) == 0:
-            if glob:
-                return np.median(self.y)
-            else:
-                return np.median(self.y, axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_median(*index, glob=glob)
         
-        elif len(index) == 1:
-            return np.median(self.y[index[0],:])
+        rows, single = self._select_rows(index)
+        if glob and not single:
+            return np.median(self._y2d(rows))
+        medians = self._reduce_rows(np.median, rows)
         
+        if single:
+            return medians[0]
         else:
-            medians = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                    medians[count] = self.y
-                elif len(self.y.shape) == 1:
-                    medians[count] = np.median(self.y[i])
-                else:
-                    medians[count] = np.median(self.y[i,:])
-                count += 1
-            if glob:
-                return np.median(medians)
-            else:
-                return medians
-        
-        
-        
-    def stat_var(self, *index, glob=False):
+            return medians
+    
+    
+    
+    def stat_var(self, *index, glob=False, xrange=None):
         """
         Find the variances of the columns specified by *index.
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the variances shall be found.
                 
             glob: bool, optional
                 If glob=False an array containing the variance values of the columns specified by *index is returned. Otherwise the variance among those columns is returned.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1343,48 +2732,36 @@ class Data:
             ValueError
                 If an index is not smaller than Data.length.
         """
-
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
         
-        if len(index) == 0:
-            if glob:
-                return np.var(self.y)
-            else:
-                return np.var(self.y, axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_var(*index, glob=glob)
         
-        elif len(index) == 1:
-            return np.var(self.y[index[0],:])
+        rows, single = self._select_rows(index)
+        if glob and not single:
+            return self.stat_summary(*index, glob=True)['var']
+        varis = self._reduce_rows(lambda b, axis: np.var(b, axis=axis, dtype=self._accumulator()), rows)
         
+        if single:
+            return varis[0]
         else:
-            varis = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                    varis[count] = self.y
-                elif len(self.y.shape) == 1:
-                    varis[count] = np.var(self.y[i])
-                else:
-                    varis[count] = np.var(self.y[i,:])
-                count += 1
-            if glob:
-                return np.var(varis)
-            else:
-                return varis
-        
-        
-        
-    def stat_std(self, *index, glob=False):
+            return varis
+    
+    
+    
+    def stat_std(self, *index, glob=False, xrange=None):
         """
         Find the standard deviations of the columns specified by *index.
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the standard deviations shall be found.
                 
             glob: bool, optional
                 If glob=False an array containing the standard deviation values of the columns specified by *index is returned. Otherwise the standard deviation among those columns is returned.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1397,47 +2774,36 @@ class Data:
             ValueError
                 If an index is not smaller than Data.length.
         """
-
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
         
-        if len(index) == 0:
-            if glob:
-                return np.std(self.y)
-            else:
-                return np.std(self.y, axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_std(*index, glob=glob)
         
-        elif len(index) == 1:
-            return np.std(self.y[index[0],:])
+        rows, single = self._select_rows(index)
+        if glob and not single:
+            return self.stat_summary(*index, glob=True)['std']
+        stds = self._reduce_rows(lambda b, axis: np.std(b, axis=axis, dtype=self._accumulator()), rows)
         
+        if single:
+            return stds[0]
         else:
-            stds = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                   stds[count] = self.y
-                elif len(self.y.shape) == 1:
-                    stds[count] = np.std(self.y[i])
-                else:
-                    stds[count] = np.std(self.y[i,:])
-                count += 1
-            if glob:
-                return np.std(stds)
-            else:
-                return stds
-            
-            
-    def stat_sum(self, *index, glob=False):
+            return stds
+    
+    
+    
+    def stat_sum(self, *index, glob=False, xrange=None):
         """
         Find the sums of the columns specified by *index.
         
         Parameters
         ----------
-            *index: zero or more ints.
+            *index: zero or more ints, or a single slice, boolean mask or index array.
                 The indices specifying the columns of which the sums shall be found.
                 
             glob: bool, optional
                 If glob=False an array containing the sum values of the columns specified by *index is returned. Otherwise the sum among those columns is returned.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
         Returns
         -------
@@ -1450,35 +2816,326 @@ class Data:
             ValueError
                 If an index is not smaller than Data.length.
         """
-
-        if np.any(np.array(index) >= self.length):
-            raise IndexError("At least one index is out of range for Data with length %d."%self.length)
         
-        if len(index) == 0:
-            if glob:
-                return np.sum(self.y)
-            else:
-                return np.sum(self.y, axis=1)
+        if xrange is not None:
+            return self.xslice(*xrange).stat_sum(*index, glob=glob)
         
-        elif len(index) == 1:
-            return np.sum(self.y[index[0],:])
+        rows, single = self._select_rows(index)
+        sums = self._reduce_rows(lambda b, axis: np.sum(b, axis=axis, dtype=self._accumulator()), rows)
         
+        if single:
+            return sums[0]
+        elif glob:
+            return np.sum(sums)
         else:
-            sums = np.zeros(len(index))
-            count = 0
-            for i in index:
-                if type(self.y) in (int, float):
-                   sums[count] = self.y
-                elif len(self.y.shape) == 1:
-                    sums[count] = np.sum(self.y[i])
-                else:
-                    sums[count] = np.sum(self.y[i,:])
-                count += 1
-            if glob:
-                return np.sum(sums)
+            return sums
+    
+    
+    
+    def stat_summary(self, *index, glob=False, chunk=None, xrange=None):
+        """
+        Find count, sum, mean, variance, standard deviation, minimum and maximum of the columns specified by *index in a single pass. The y-arrays are processed in chunks of rows, which are merged with RunningStats, so memory-mapped Data is never loaded as a whole.
+        
+        Parameters
+        ----------
+            *index: zero or more ints, or a single slice, boolean mask or index array.
+                The indices specifying the columns of which the statistics shall be found. If *index is not specified, all columns are used.
+                
+            glob: bool, optional
+                If glob=False the statistics of each column specified by *index are returned. Otherwise the statistics among all values of those columns are returned. Default is False.
+                
+            chunk: int, optional
+                The number of columns processed at once. Default is None, which chooses the chunks such that they cover at most Data.CHUNK_BYTES.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
+            
+        Returns
+        -------
+            summary: dict
+                A dictionary with the keys 'count', 'sum', 'mean', 'var', 'std', 'min' and 'max'. The values are arrays of shape (len(index),), or numbers if glob=True or only one index is specified.
+                
+        Raises
+        ------
+            IndexError
+                If an index is not smaller than Data.length.
+        """
+        
+        if xrange is not None:
+            return self.xslice(*xrange).stat_summary(*index, glob=glob, chunk=chunk)
+        
+        rows, single = self._select_rows(index)
+        if rows is None:
+            length = self.length
+        else:
+            length = len(rows)
+        
+        if chunk == None:
+            chunks = self._row_chunks(length)
+        else:
+            chunks = (slice(start, start+chunk) for start in range(0, length, chunk))
+        
+        if rows is not None:
+            chunks = (rows[c] for c in chunks)
+        
+        def accumulate(c):
+            block = self._y2d(c)
+            if glob or single:
+                stats = RunningStats()
+                stats.update(block)
             else:
-                return sums
+                stats = RunningStats(len(block))
+                stats.update(block, axis=1)
+            return stats
+        
+        results = self._map_chunks(accumulate, chunks)
+        
+        if glob or single:
+            stats = RunningStats()
+            for r in results:
+                stats.merge(r)
+            return stats.summary()
+        
+        summaries = [r.summary() for r in results]
+        if len(summaries) == 0:
+            return RunningStats(0).summary()
+        
+        summary = {}
+        for key in summaries[0]:
+            summary[key] = np.concatenate([s[key] for s in summaries])
+        return summary
+    
+    
+    
+    def stat_cov(self, *index, ddof=0, out=None, xrange=None):
+        """
+        Find the covariances of all pairs of the columns specified by *index. The matrix is computed tile by tile with matrix products of mean-centered blocks of columns, so it can be larger than memory if out is a file.
+        
+        Parameters
+        ----------
+            *index: zero or more ints, or a single slice, boolean mask or index array.
+                The indices specifying the columns. If *index is not specified, all columns are used.
+                
+            ddof: int, optional
+                The covariances are normalized by len(x) - ddof. Default is 0, as for Data.stat_var.
+                
+            out: numpy array or str, optional
+                A preallocated array of shape (n, n) or the path of a .npy file, which is created as memory-mapped array, to write the matrix to. Default is None.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
+            
+        Returns
+        -------
+            cov: numpy array
+                The covariance matrix of shape (n, n), where n is the number of columns specified by *index.
+        """
+        if xrange is not None:
+            return self.xslice(*xrange).stat_cov(*index, ddof=ddof, out=out)
+        
+        return self._pairwise('cov', index, out, ddof=ddof)
+    
+    
+    
+    def stat_corr(self, *index, out=None, xrange=None):
+        """
+        Find the Pearson correlation coefficients of all pairs of the columns specified by *index. The matrix is computed tile by tile with matrix products of normalized blocks of columns, so it can be larger than memory if out is a file.
+        
+        Parameters
+        ----------
+            *index: zero or more ints, or a single slice, boolean mask or index array.
+                The indices specifying the columns. If *index is not specified, all columns are used.
+                
+            out: numpy array or str, optional
+                A preallocated array of shape (n, n) or the path of a .npy file, which is created as memory-mapped array, to write the matrix to. Default is None.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
+            
+        Returns
+        -------
+            corr: numpy array
+                The correlation matrix of shape (n, n), where n is the number of columns specified by *index.
+        """
+        if xrange is not None:
+            return self.xslice(*xrange).stat_corr(*index, out=out)
+        
+        return self._pairwise('corr', index, out)
+    
+    
+    
+    def stat_pairwise(self, *index, metric='euclidean', out=None, xrange=None):
+        """
+        Find the distances of all pairs of the columns specified by *index. The matrix is computed tile by tile with matrix products of blocks of columns, so it can be larger than memory if out is a file.
+        
+        Parameters
+        ----------
+            *index: zero or more ints, or a single slice, boolean mask or index array.
+                The indices specifying the columns. If *index is not specified, all columns are used.
+                
+            metric: str, optional
+                'euclidean', 'sqeuclidean' (squared euclidean), 'cosine' (1 - cosine similarity), 'correlation' (1 - correlation coefficient) or 'dot' (scalar product). Default is 'euclidean'.
+                
+            out: numpy array or str, optional
+                A preallocated array of shape (n, n) or the path of a .npy file, which is created as memory-mapped array, to write the matrix to. Default is None.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
+            
+        Returns
+        -------
+            dist: numpy array
+                The distance matrix of shape (n, n), where n is the number of columns specified by *index.
+                
+        Raises
+        ------
+            ValueError
+                If metric is unknown.
+        """
+        if xrange is not None:
+            return self.xslice(*xrange).stat_pairwise(*index, metric=metric, out=out)
+        
+        return self._pairwise(metric, index, out)
+    
+    
+    
+    def stat_nearest(self, k, *index, metric='euclidean', xrange=None):
+        """
+        Find for each column specified by *index the k nearest other columns. The distances are computed tile by tile and only the k best candidates are kept per column, so the full distance matrix is never stored.
+        
+        Parameters
+        ----------
+            k: int
+                The number of nearest columns to find.
+                
+            *index: zero or more ints, or a single slice, boolean mask or index array.
+                The indices specifying the columns. If *index is not specified, all columns are used.
+                
+            metric: str, optional
+                'euclidean', 'sqeuclidean', 'cosine' or 'correlation', see Data.stat_pairwise. Default is 'euclidean'.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are used. The range is found by a binary search in the sorted x (or arithmetically for a uniform grid) and the statistics are computed on a view, see Data.xslice. Default is None, i.e. all x-values.
             
+        Returns
+        -------
+            nearest: numpy array
+                The indices of the nearest columns (indices of Data) of shape (n, k), sorted by increasing distance.
+                
+            distances: numpy array
+                The corresponding distances of shape (n, k).
+                
+        Raises
+        ------
+            ValueError
+                If metric is unknown or k is not smaller than the number of columns specified by *index.
+        """
+        
+        if xrange is not None:
+            return self.xslice(*xrange).stat_nearest(k, *index, metric=metric)
+        
+        if metric not in ('euclidean', 'sqeuclidean', 'cosine', 'correlation'):
+            raise ValueError("metric must be 'euclidean', 'sqeuclidean', 'cosine' or 'correlation'.")
+        
+        rows, prepare, finish, blocks = self._pairwise_kernel(metric, index)
+        if k >= len(rows):
+            raise ValueError("k must be smaller than the number of columns, %d."%len(rows))
+        
+        def nearest(a):
+            A = prepare(a)
+            bestdist = np.zeros((A.shape[0], 0))
+            bestrows = np.zeros((A.shape[0], 0), dtype=np.intp)
+            for b in blocks:
+                dist = finish(A @ prepare(b).T, a, b)
+                if a == b:
+                    np.fill_diagonal(dist, np.inf)
+                dist = np.hstack([bestdist, dist])
+                candidates = np.hstack([bestrows, np.broadcast_to(np.arange(b.start, b.stop), (A.shape[0], b.stop-b.start))])
+                keep = np.argpartition(dist, k-1, axis=1)[:,:k]
+                bestdist = np.take_along_axis(dist, keep, axis=1)
+                bestrows = np.take_along_axis(candidates, keep, axis=1)
+            order = np.argsort(bestdist, axis=1, kind='stable')
+            return np.take_along_axis(bestrows, order, axis=1), np.take_along_axis(bestdist, order, axis=1)
+        
+        results = self._map_chunks(nearest, blocks)
+        nearestrows = np.vstack([r[0] for r in results])
+        distances = np.vstack([r[1] for r in results])
+        return rows[nearestrows], distances
+    
+    
+    
+    def _pairwise(self, kind, index, out, ddof=0):
+        """
+        Computes the pairwise matrix of the kind given by Data._pairwise_kernel for the columns specified by index, tile by tile, into out.
+        """
+        
+        rows, prepare, finish, blocks = self._pairwise_kernel(kind, index, ddof=ddof)
+        n = len(rows)
+        if out is None:
+            out = np.empty((n, n))
+        elif isinstance(out, str):
+            out = np.lib.format.open_memmap(out, mode='w+', dtype=np.float64, shape=(n, n))
+        elif out.shape != (n, n):
+            raise ValueError("out must be of shape (%d, %d), but has shape %s."%(n, n, str(out.shape)))
+        
+        tiles = [(a, b) for i, a in enumerate(blocks) for b in blocks[i:]]
+        
+        def compute(tile):
+            a, b = tile
+            A = prepare(a)
+            values = finish(A @ (A if a == b else prepare(b)).T, a, b)
+            out[a, b] = values
+            out[b, a] = values.T
+        
+        self._map_chunks(compute, tiles)
+        return out
+    
+    
+    
+    def _pairwise_kernel(self, kind, index, ddof=0):
+        """
+        Returns the selected rows, a function prepare(block), which returns the prepared y-arrays of a block (slice of the selected rows), a function finish(products, a, b), which turns the products of the prepared blocks a and b into the result, and the blocks of rows. Both a block and the tile of products of two blocks cover at most Data.CHUNK_BYTES.
+        """
+        
+        if kind not in ('cov', 'corr', 'euclidean', 'sqeuclidean', 'cosine', 'correlation', 'dot'):
+            raise ValueError("metric must be 'euclidean', 'sqeuclidean', 'cosine', 'correlation' or 'dot'.")
+        
+        rows = self._select_rows(index)[0]
+        if rows is None:
+            rows = np.arange(self.length)
+        samples = self._y2d(rows[:1]).shape[1] if len(rows) > 0 else 0
+        
+        means = np.zeros(len(rows))
+        scale = np.ones(len(rows))
+        squares = None
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if kind in ('cov', 'corr', 'correlation'):
+                means = self.stat_mean(rows)
+            if kind == 'cov':
+                scale[:] = 1/np.sqrt(max(samples - ddof, 1))
+            elif kind in ('corr', 'correlation'):
+                scale = 1/np.sqrt(self.stat_var(rows)*samples)
+            elif kind == 'cosine':
+                scale = 1/np.sqrt(self._reduce_rows(lambda b, axis: np.einsum('ij,ij->i', b, b, dtype=np.float64), rows))
+            elif kind in ('euclidean', 'sqeuclidean'):
+                squares = self._reduce_rows(lambda b, axis: np.einsum('ij,ij->i', b, b, dtype=np.float64), rows)
+        
+        def prepare(block):
+            return (self._y2d(rows[block]) - means[block,None])*scale[block,None]
+        
+        def finish(products, a, b):
+            if kind in ('cosine', 'correlation'):
+                return 1 - products
+            if kind in ('euclidean', 'sqeuclidean'):
+                products = np.maximum(squares[a,None] + squares[None,b] - 2*products, 0)
+                return np.sqrt(products) if kind == 'euclidean' else products
+            return products
+        
+        step = max(1, min(Data.CHUNK_BYTES//(8*max(1, samples)), int(np.sqrt(Data.CHUNK_BYTES/8))))
+        blocks = [slice(start, min(start+step, len(rows))) for start in range(0, len(rows), step)]
+        return rows, prepare, finish, blocks
+    
+    
     
     # ******************************************************** FITTING *******************************************************
     
@@ -1487,7 +3144,28 @@ class Data:
     # ******************************************************** PLOTTING *******************************************************
     
     
-    def plot(self, *index, axes=None, logx=False, logy=False, legend=True, linestyle='-', marker='.', xlabel=True, ylabel=True, title=None, linewidth=1.5, markersize=5):
+    def plot(self, *index, axes=None, logx=False, logy=False, legend=True, linestyle='-', marker='.', xlabel=True, ylabel=True, title=None, linewidth=1.5, markersize=5, decimate=False, xrange=None):
+        """
+        Plot the columns specified by *index against x. If *index is not specified, all columns are plotted.
+        
+        Parameters
+        ----------
+            *index: zero or more ints.
+                The columns to be plotted.
+                
+            decimate: bool, optional
+                If decimate=True, each column is reduced to the minimum and maximum of about as many buckets as the axes are wide in pixels, so peaks are preserved while the number of plotted points does not depend on the length of the columns. The minima and maxima are precomputed for buckets of 2, 4, 8, ... values once per column, and the plot is decimated again from them, when the x-limits change (e.g. on zooming). Requires sorted x. Default is False.
+                
+            xrange: tuple of two numbers, optional
+                Only the x-values xrange[0] <= x <= xrange[1] are plotted, see Data.xslice. Default is None, i.e. all x-values.
+                
+            The remaining parameters are passed to matplotlib.
+        """
+        
+        if xrange is not None:
+            return self.xslice(*xrange).plot(*index, axes=axes, logx=logx, logy=logy, legend=legend, linestyle=linestyle, marker=marker, xlabel=xlabel, ylabel=ylabel, title=title, linewidth=linewidth, markersize=markersize, decimate=decimate)
+        
+        import matplotlib.pyplot as plt
         
         
         if np.any(np.array(index) >= self.length):
@@ -1519,29 +3197,105 @@ class Data:
             rng = range(self.length)
         else:
             rng = index
-            
+        
+        x = self.x
+        decimated = []
         for i in rng:
+            xvalues = x
+            yvalues = self.y[i,:]
+            if decimate:
+                levels = Data._minmax_levels(yvalues)
+                visible = Data._minmax_indices(levels, 0, len(yvalues), Data._plot_buckets(ax))
+                xvalues = x[visible]
+                yvalues = yvalues[visible]
+            
             if legend:
                 string = ''
                 if self.properties[i] == None:
-                    string = 'None'
+                    string = 'None, '
                 else:
                     for j in self.properties[i]:
                         string += str(j) + ':' + str(self.properties[i][j]) + ', '
                     
-                command(self.x, self.y[i,:], label=string[0:-2], linestyle=linestyle, marker=marker, linewidth=linewidth, markersize=markersize)
+                line = command(xvalues, yvalues, label=string[0:-2], linestyle=linestyle, marker=marker, linewidth=linewidth, markersize=markersize)[0]
         
                 plt.legend()
             else:
-                command(self.x, self.y[i,:], linestyle=linestyle, marker=marker)
+                line = command(xvalues, yvalues, linestyle=linestyle, marker=marker)[0]
+            
+            if decimate:
+                decimated.append((line, self.y[i,:], levels))
+        
+        if decimate:
+            def redecimate(ax):
+                xmin, xmax = sorted(ax.get_xlim())
+                start = max(0, np.searchsorted(x, xmin, side='left')-1)
+                stop = min(len(x), np.searchsorted(x, xmax, side='right')+1)
+                buckets = Data._plot_buckets(ax)
+                for line, row, levels in decimated:
+                    visible = Data._minmax_indices(levels, start, stop, buckets)
+                    line.set_data(x[visible], row[visible])
+            
+            ax.callbacks.connect('xlim_changed', redecimate)
                 
               
               
               
+    @staticmethod
+    def _plot_buckets(ax):
+        """
+        Returns the number of buckets for decimating a plot on the axes ax, i.e. its width in pixels.
+        """
+        return max(1, int(ax.get_window_extent().width))
+    
+    
+    
+    
+    @staticmethod
+    def _minmax_levels(y):
+        """
+        Returns for every level k = 1, 2, ... the indices of the minima and maxima of y in consecutive buckets of 2**k values.
+        """
+        
+        levels = []
+        imin = np.arange(len(y))
+        imax = imin
+        while len(imin) > 1:
+            if len(imin)%2 == 1:
+                imin = np.append(imin, imin[-1])
+                imax = np.append(imax, imax[-1])
+            imin = np.where(y[imin[1::2]] < y[imin[0::2]], imin[1::2], imin[0::2])
+            imax = np.where(y[imax[1::2]] > y[imax[0::2]], imax[1::2], imax[0::2])
+            levels.append((imin, imax))
+        return levels
+    
+    
+    
+    
+    @staticmethod
+    def _minmax_indices(levels, start, stop, buckets):
+        """
+        Returns the sorted indices of the minima and maxima of between buckets and 2*buckets buckets covering the values start to stop, taken from the coarsest suitable level of Data._minmax_levels.
+        """
+        
+        n = stop - start
+        if n <= 2*buckets:
+            return np.arange(start, stop)
+        
+        k = min(int(np.log2(n/buckets)), len(levels))
+        imin, imax = levels[k-1]
+        first = start >> k
+        last = ((stop-1) >> k) + 1
+        return np.unique(np.concatenate([imin[first:last], imax[first:last]]))
+              
+              
+              
               
               
     def plot_correl(self, index1, index2, axes=None, logx=False, logy=False, legend=True, linestyle='none', marker='.', xlabel=True, ylabel=True, title=None, linewidth=1.5, markersize=5):
         
+        import matplotlib.pyplot as plt
+        
         if index1 > self.length:
             raise ValueError("index1 is too large for Data with length %d."%self.length)
         if index2 > self.length:
@@ -1583,19 +3337,51 @@ class Data:
     
     
     
-    def plot_correlmat(self, logx=False, logy=False, legend=False, linestyle='none', marker='.', xlabel=True, ylabel=True, title=None, linewidth=1.5, markersize=5, figsize=(10,7)):
-        
+    def plot_correlmat(self, logx=False, logy=False, legend=False, linestyle='none', marker='.', xlabel=True, ylabel=True, title=None, linewidth=1.5, markersize=5, figsize=(10,7), mode='scatter', bins=20, upper=False):
+        """
+        Plot the correlations between all pairs of columns as a matrix, where row i and column j show y[i,:] against y[j,:].
         
-        plt.figure(figsize=figsize)
-        if title != None:
-            plt.suptitle(title)
-            
-        for i in range(self.length):
-            for j in range(self.length):
+        Parameters
+        ----------
+            mode: str, optional
+                'scatter' draws a scatter plot for every pair in its own subplot. 'density' draws the two-dimensional histograms of all pairs as a single image, computed in one vectorized binning pass. 'coef' draws the correlation coefficients of all pairs as a heatmap. Default is 'scatter'.
                 
-                ax = plt.subplot(self.length, self.length, i*self.length+j+1)
+            bins: int, optional
+                The number of bins per axis of each histogram, if mode='density'. Default is 20.
                 
-                if logx and logy:
+            upper: bool, optional
+                If upper=True, only the upper triangle (j >= i) of the matrix is drawn. Default is False.
+                
+            The remaining parameters are passed to matplotlib.
+            
+        Raises
+        ------
+            ValueError
+                If mode is unknown.
+        """
+        
+        import matplotlib.pyplot as plt
+        
+        if mode not in ('scatter', 'density', 'coef'):
+            raise ValueError("mode must be 'scatter', 'density' or 'coef'.")
+        
+        plt.figure(figsize=figsize)
+        if title != None:
+            plt.suptitle(title)
+        
+        if mode != 'scatter':
+            self._plot_correlimage(mode, bins, upper, xlabel, ylabel)
+            return
+            
+        for i in range(self.length):
+            for j in range(self.length):
+                
+                if upper and j < i:
+                    continue
+                
+                ax = plt.subplot(self.length, self.length, i*self.length+j+1)
+                
+                if logx and logy:
                     command = ax.loglog
                 elif logx and not logy:
                     command = ax.semilogx
@@ -1619,7 +3405,1294 @@ class Data:
                     command(self.y[i,:], self.y[j,:], label='y[%d,:] vs y[%d,:]'%(i,j), linestyle=linestyle, marker=marker, linewidth=linewidth, markersize=markersize)
                 else:
                     command(self.y[i,:], self.y[j,:], linestyle=linestyle, marker=marker, linewidth=linewidth, markersize=markersize)
-                    
+    
+    
+    
+    
+    def _plot_correlimage(self, mode, bins, upper, xlabel, ylabel):
+        """
+        Draws the correlation matrix of Data.plot_correlmat for mode='density' or mode='coef' as a single image, in which pair (i, j) is the tile in row i and column j.
+        """
+        
+        import matplotlib.pyplot as plt
+        
+        n = self.length
+        if mode == 'coef':
+            image = self.stat_corr()
+            tile = 1
+        else:
+            image = self._pair_histograms(bins)
+            image = np.log1p(image.reshape(n, bins, n, bins)[:,::-1,:,:].reshape(n*bins, n*bins))
+            tile = bins
+        
+        if upper:
+            rows = np.arange(n*tile)//tile
+            image = np.where(rows[None,:] >= rows[:,None], image, np.nan)
+        
+        ax = plt.subplot(1,1,1)
+        if mode == 'coef':
+            im = ax.imshow(image, cmap='RdBu_r', vmin=-1, vmax=1, extent=(-0.5, n-0.5, n-0.5, -0.5), interpolation='nearest')
+            plt.colorbar(im, ax=ax)
+        else:
+            ax.imshow(image, cmap='viridis', extent=(-0.5, n-0.5, n-0.5, -0.5), interpolation='nearest')
+            ax.set_xticks(np.arange(n+1)-0.5, minor=True)
+            ax.set_yticks(np.arange(n+1)-0.5, minor=True)
+            ax.grid(which='minor', color='w', linewidth=0.5)
+            ax.tick_params(which='minor', length=0)
+        
+        if n <= 50:
+            ax.set_xticks(range(n))
+            ax.set_yticks(range(n))
+            ax.set_xticklabels(['y%d'%j for j in range(n)] if xlabel else [])
+            ax.set_yticklabels(['y%d'%i for i in range(n)] if ylabel else [])
+    
+    
+    
+    
+    def _pair_histograms(self, bins):
+        """
+        Returns the two-dimensional histograms of all pairs of columns as an array H of shape (Data.length*bins, Data.length*bins), where H[i*bins+a, j*bins+b] counts the x-values at which y[i,:] falls into bin a and y[j,:] into bin b. Each column is binned over its own range. The histograms are accumulated as products of one-hot encoded bin indices, chunk by chunk of x-values.
+        """
+        
+        n = self.length
+        lo = self.stat_min()
+        hi = self.stat_max()
+        width = np.where(hi > lo, hi - lo, 1)
+        
+        histograms = np.zeros((n*bins, n*bins), dtype=np.float32)
+        offsets = (np.arange(n)*bins)[:,None]
+        samples = self.y.shape[1]
+        step = max(1, Data.CHUNK_BYTES//(4*n*bins))
+        for start in range(0, samples, step):
+            block = self.y[:,start:start+step]
+            binned = np.clip(((block - lo[:,None])/width[:,None]*bins).astype(np.intp), 0, bins-1)
+            onehot = np.zeros((n*bins, block.shape[1]), dtype=np.float32)
+            onehot[(binned + offsets).ravel(), np.tile(np.arange(block.shape[1]), n)] = 1
+            histograms += onehot @ onehot.T
+        return histograms
+
+
+
+
+class RunningStats:
+    
+    """
+    Accumulates count, sum, mean, variance, minimum and maximum of a stream of chunks in a single pass. Each chunk is reduced exactly in memory and merged into the running values with the pairwise update of Chan et al., so the result is as accurate as the two-pass np.var and only one chunk needs to be resident at a time. This works for chunks of memory-mapped arrays as well as chunks produced by a generator.
+    """
+    
+    def __init__(self, shape=()):
+        """
+        Initializes empty running statistics.
+        
+        Parameters
+        ----------
+            shape: int or tuple of ints, optional
+                The shape of the statistics, i.e. the shape of the chunks without the axis they are reduced along. Default is (), i.e. every statistic is a number.
+        """
+        
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+    
+    
+    
+    
+    def update(self, chunk, axis=None):
+        """
+        Merges a chunk of values into the running statistics.
+        
+        Parameters
+        ----------
+            chunk: array-like
+                The values to be merged.
                 
-                    
-                    
\ No newline at end of file
+            axis: int, optional
+                The axis of chunk along which the values are accumulated. Default is None, which accumulates all values of chunk.
+        """
+        
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if axis == None:
+            n = chunk.size
+        else:
+            n = chunk.shape[axis]
+        if n == 0:
+            return
+        
+        chunkmean = chunk.mean(axis=axis, keepdims=True)
+        chunkm2 = ((chunk - chunkmean)**2).sum(axis=axis)
+        chunkmean = np.squeeze(chunkmean, axis=axis)
+        
+        total = self.count + n
+        delta = chunkmean - self.mean
+        self.mean = self.mean + delta*n/total
+        self.m2 = self.m2 + chunkm2 + delta**2*self.count*n/total
+        self.count = total
+        
+        self.sum = self.sum + chunk.sum(axis=axis)
+        self.min = np.minimum(self.min, chunk.min(axis=axis))
+        self.max = np.maximum(self.max, chunk.max(axis=axis))
+    
+    
+    
+    
+    def merge(self, other):
+        """
+        Merges the running statistics other, which has the same shape, into these.
+        
+        Parameters
+        ----------
+            other: RunningStats
+                The statistics to be merged.
+        """
+        
+        if np.all(other.count == 0):
+            return
+        
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta*other.count/total
+        self.m2 = self.m2 + other.m2 + delta**2*self.count*other.count/total
+        self.count = total
+        
+        self.sum = self.sum + other.sum
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+    
+    
+    
+    
+    def summary(self):
+        """
+        Returns the accumulated statistics.
+        
+        Returns
+        -------
+            summary: dict
+                A dictionary with the keys 'count', 'sum', 'mean', 'var', 'std', 'min' and 'max'. The variance is the population variance as returned by np.var.
+        """
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.where(self.count > 0, self.m2/self.count, np.nan)
+        
+        summary = {'count': self.count, 'sum': self.sum, 'mean': self.mean, 'var': var, 'std': np.sqrt(var), 'min': self.min, 'max': self.max}
+        for key in summary:
+            summary[key] = np.asarray(summary[key])[()]
+        return summary
+
+
+
+
+class PropertyTable:
+    
+    """
+    Columnar storage of the properties of Data. It behaves like the dictionary of int-dict pairs described in Data.__init__, i.e. table[i] is a dictionary or None, but every property key is stored as one typed numpy array over all rows together with a mask of the rows that have the key. Rows with the same few keys therefore cost a few bytes per key instead of a Python dictionary each. Numbers and bools are stored in int64, float64 or bool arrays, all other values in object arrays.
+    
+    The dictionaries returned by table[i] are built on access, so changing them does not change the table. Use table[i] = props (or Data.set_properties) instead.
+    """
+    
+    def __init__(self, properties=None, length=0):
+        """
+        Initializes a PropertyTable.
+        
+        Parameters
+        ----------
+            properties: dict or PropertyTable, optional
+                A dictionary of int-dict pairs (dict or None) to fill the table with. Default is None, i.e. no properties.
+                
+            length: int, optional
+                The number of rows of the table. Rows without properties are None. Default is 0.
+        """
+        
+        self.length = 0
+        self.capacity = 0
+        self.columns = {}
+        self.present = {}
+        self.isnone = np.ones(0, dtype=bool)
+        self.nkeys = np.zeros(0, dtype=np.int64)
+        
+        self._hashindex = {}
+        self._sortindex = {}
+        
+        self._base = None
+        self._views = None
+        
+        self.reserve(length)
+        self.length = length
+        
+        if properties is not None:
+            for i in properties:
+                self[i] = properties[i]
+    
+    
+    
+    
+    def __len__(self):
+        return self.length
+    
+    
+    def __iter__(self):
+        return iter(range(self.length))
+    
+    
+    def __contains__(self, key):
+        return isinstance(key, (int, np.integer)) and 0 <= key < self.length
+    
+    
+    def keys(self):
+        return range(self.length)
+    
+    
+    def values(self):
+        return [self[i] for i in range(self.length)]
+    
+    
+    def items(self):
+        return [(i, self[i]) for i in range(self.length)]
+    
+    
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+    
+    
+    def __eq__(self, other):
+        if isinstance(other, PropertyTable):
+            other = dict(other.items())
+        elif not isinstance(other, dict):
+            return NotImplemented
+        if len(other) != self.length:
+            return False
+        return dict(self.items()) == other
+    
+    
+    
+    
+    def __getitem__(self, key):
+        """
+        Returns the properties of row key as a dictionary or None.
+        """
+        
+        if key not in self:
+            raise KeyError(key)
+        if self.isnone[key]:
+            return None
+        
+        props = {}
+        for name in self.columns:
+            if self.present[name][key]:
+                value = self.columns[name][key]
+                if self.columns[name].dtype != object:
+                    value = value.item()
+                props[name] = value
+        return props
+    
+    
+    
+    
+    def __setitem__(self, key, props):
+        """
+        Sets the properties of row key to the dictionary or None props. If key is not smaller than the length of the table, the table is extended by rows without properties.
+        """
+        
+        if type(props) != dict and props != None:
+            raise TypeError("The values of properties must be of type dict or None.")
+        
+        self._unshare()
+        if key >= self.length:
+            self.reserve(key+1)
+            self.length = key+1
+        
+        for name in self.present:
+            if self.present[name][key]:
+                self.present[name][key] = False
+                self._invalidate(name)
+        self.isnone[key] = props == None
+        self.nkeys[key] = 0
+        if props == None:
+            return
+        
+        for name in props:
+            self._set_value(name, key, props[name])
+        self.nkeys[key] = len(props)
+    
+    
+    
+    
+    def __delitem__(self, key):
+        self.delete([key])
+    
+    
+    
+    
+    def delete(self, rows):
+        """
+        Deletes rows from the table in a single pass and renumbers the remaining rows consecutively.
+        
+        Parameters
+        ----------
+            rows: array-like of ints
+                The rows to be deleted.
+        """
+        
+        keep = np.ones(self.length, dtype=bool)
+        keep[np.asarray(rows, dtype=np.intp)] = False
+        
+        for name in list(self.columns):
+            present = self.present[name][:self.length][keep]
+            if not present.any():
+                del(self.columns[name])
+                del(self.present[name])
+                continue
+            self.columns[name] = self.columns[name][:self.length][keep]
+            self.present[name] = present
+        self.isnone = self.isnone[:self.length][keep]
+        self.nkeys = self.nkeys[:self.length][keep]
+        
+        self.length = len(self.isnone)
+        self.capacity = self.length
+        
+        self._hashindex = {}
+        self._sortindex = {}
+    
+    
+    
+    
+    def reserve(self, capacity):
+        """
+        Reserves storage for at least capacity rows. The capacity grows geometrically by Data.BUFFER_GROWTH, so adding rows one by one costs amortized O(1).
+        
+        Parameters
+        ----------
+            capacity: int
+                The number of rows to reserve storage for.
+        """
+        
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, int(self.capacity*Data.BUFFER_GROWTH))
+        
+        for name in self.columns:
+            self.columns[name] = PropertyTable._resize(self.columns[name], capacity, self.length)
+            self.present[name] = PropertyTable._resize(self.present[name], capacity, self.length)
+        self.isnone = PropertyTable._resize(self.isnone, capacity, self.length, fill=True)
+        self.nkeys = PropertyTable._resize(self.nkeys, capacity, self.length)
+        self.capacity = capacity
+    
+    
+    
+    
+    def maxlen(self):
+        """
+        Returns the largest number of properties of a row.
+        """
+        
+        if self.length == 0:
+            return 0
+        return int(self.nkeys[:self.length].max())
+    
+    
+    
+    
+    def find(self, name, op, value):
+        """
+        Finds the rows, whose property name compares to value as specified by op. Equality is looked up in a hash index and the other comparisons in a sorted index of the property. The indexes are built on first use and dropped, when the property is changed or rows are deleted.
+        
+        Parameters
+        ----------
+            name: hashable
+                The key of the property.
+                
+            op: str
+                One of '==', '!=', '<', '<=', '>' and '>='. Rows without the property never match.
+                
+            value: object
+                The value to compare with.
+                
+        Returns
+        -------
+            rows: numpy array
+                The matching rows in ascending order.
+                
+        Raises
+        ------
+            ValueError
+                If op is unknown.
+        """
+        
+        if op not in ('==', '!=', '<', '<=', '>', '>='):
+            raise ValueError("op must be one of '==', '!=', '<', '<=', '>' and '>='.")
+        if name not in self.columns:
+            return np.zeros(0, dtype=np.intp)
+        
+        if op == '==':
+            rows = self._hash_index(name).get(value)
+            return np.zeros(0, dtype=np.intp) if rows is None else rows.copy()
+        if op == '!=':
+            rows = np.flatnonzero(self.present[name][:self.length])
+            return np.setdiff1d(rows, self.find(name, '==', value), assume_unique=True)
+        
+        values, rows = self._sort_index(name)
+        if op == '<':
+            rows = rows[:np.searchsorted(values, value, side='left')]
+        elif op == '<=':
+            rows = rows[:np.searchsorted(values, value, side='right')]
+        elif op == '>':
+            rows = rows[np.searchsorted(values, value, side='right'):]
+        else:
+            rows = rows[np.searchsorted(values, value, side='left'):]
+        return np.sort(rows)
+    
+    
+    
+    
+    def take(self, rows):
+        """
+        Returns a new table with the given rows, numbered consecutively.
+        
+        Parameters
+        ----------
+            rows: array-like of ints
+                The rows to take.
+        """
+        
+        rows = np.asarray(rows, dtype=np.intp)
+        table = PropertyTable()
+        table.length = len(rows)
+        table.capacity = len(rows)
+        for name in self.columns:
+            present = self.present[name][rows]
+            if present.any():
+                table.columns[name] = self.columns[name][rows]
+                table.present[name] = present
+        table.isnone = self.isnone[rows]
+        table.nkeys = self.nkeys[rows]
+        return table
+    
+    
+    
+    
+    def _hash_index(self, name):
+        """
+        Returns the hash index of property name, a dictionary mapping each value to the rows having it.
+        """
+        
+        if name not in self._hashindex:
+            rows = np.flatnonzero(self.present[name][:self.length])
+            values = self.columns[name][rows]
+            index = {}
+            if values.dtype != object:
+                unique, inverse = np.unique(values, return_inverse=True)
+                order = np.argsort(inverse, kind='stable')
+                groups = np.split(rows[order], np.cumsum(np.bincount(inverse, minlength=len(unique)))[:-1])
+                index = dict(zip(unique.tolist(), groups))
+            else:
+                for row, value in zip(rows, values):
+                    index.setdefault(value, []).append(row)
+                for value in index:
+                    index[value] = np.array(index[value], dtype=np.intp)
+            self._hashindex[name] = index
+        return self._hashindex[name]
+    
+    
+    
+    
+    def _sort_index(self, name):
+        """
+        Returns the sorted index of property name, the sorted values and the rows they belong to.
+        """
+        
+        if name not in self._sortindex:
+            rows = np.flatnonzero(self.present[name][:self.length])
+            values = self.columns[name][rows]
+            order = np.argsort(values, kind='stable')
+            self._sortindex[name] = (values[order], rows[order])
+        return self._sortindex[name]
+    
+    
+    
+    
+    def _invalidate(self, name):
+        """
+        Drops the indexes of property name.
+        """
+        
+        self._hashindex.pop(name, None)
+        self._sortindex.pop(name, None)
+    
+    
+    
+    
+    def copy(self):
+        """
+        Returns a copy of the table.
+        """
+        
+        table = PropertyTable()
+        table.length = self.length
+        table.capacity = self.length
+        for name in self.columns:
+            table.columns[name] = self.columns[name][:self.length].copy()
+            table.present[name] = self.present[name][:self.length].copy()
+        table.isnone = self.isnone[:self.length].copy()
+        table.nkeys = self.nkeys[:self.length].copy()
+        return table
+    
+    
+    
+    
+    @staticmethod
+    def concatenate(tables):
+        """
+        Returns a table with the rows of all tables one after another, built column by column.
+        
+        Parameters
+        ----------
+            tables: list of PropertyTable
+                The tables to be concatenated.
+        """
+        
+        table = PropertyTable()
+        lengths = [t.length for t in tables]
+        table.length = sum(lengths)
+        table.capacity = table.length
+        table.isnone = np.concatenate([t.isnone[:t.length] for t in tables] + [np.ones(0, dtype=bool)])
+        table.nkeys = np.concatenate([t.nkeys[:t.length] for t in tables] + [np.zeros(0, dtype=np.int64)])
+        
+        names = []
+        for t in tables:
+            names += [name for name in t.columns if name not in names]
+        for name in names:
+            dtypes = set(t.columns[name].dtype for t in tables if name in t.columns)
+            dtype = dtypes.pop() if len(dtypes) == 1 else np.dtype(object)
+            column = np.zeros(table.length, dtype=dtype)
+            present = np.zeros(table.length, dtype=bool)
+            start = 0
+            for t, n in zip(tables, lengths):
+                if name in t.columns:
+                    column[start:start+n] = t.columns[name][:n]
+                    present[start:start+n] = t.present[name][:n]
+                start += n
+            table.columns[name] = column
+            table.present[name] = present
+        return table
+    
+    
+    
+    
+    def view(self, rows):
+        """
+        Returns a table of the rows selected by the slice rows, whose columns are views of the columns of this table. The view is registered at the table owning the columns, so either side copies them before it is changed, see PropertyTable._unshare.
+        """
+        
+        table = PropertyTable()
+        for name in self.columns:
+            table.columns[name] = self.columns[name][:self.length][rows]
+            table.present[name] = self.present[name][:self.length][rows]
+        table.isnone = self.isnone[:self.length][rows]
+        table.nkeys = self.nkeys[:self.length][rows]
+        table.length = len(table.isnone)
+        table.capacity = table.length
+        
+        table._base = self if self._base is None else self._base
+        if table._base._views is None:
+            table._base._views = weakref.WeakValueDictionary()
+        table._base._views[id(table)] = table
+        return table
+    
+    
+    
+    
+    def _unshare(self):
+        """
+        Makes sure, that changing the columns in place changes no other table: a view copies its rows and a table with views lets all of them copy theirs. The indexes stay valid, since the copied rows are equal.
+        """
+        
+        if self._base is not None:
+            table = self.copy()
+            self.columns = table.columns
+            self.present = table.present
+            self.isnone = table.isnone
+            self.nkeys = table.nkeys
+            self.capacity = table.capacity
+            self._base._views.pop(id(self), None)
+            self._base = None
+        
+        if self._views:
+            for view in list(self._views.values()):
+                view._unshare()
+    
+    
+    
+    
+    def _set_value(self, name, row, value):
+        """
+        Writes value to the column name in row, creating the column or widening its dtype if necessary.
+        """
+        
+        dtype = PropertyTable._dtype(value)
+        if name not in self.columns:
+            self.columns[name] = np.zeros(self.capacity, dtype=dtype)
+            self.present[name] = np.zeros(self.capacity, dtype=bool)
+        
+        column = self.columns[name]
+        if column.dtype != dtype and column.dtype != object:
+            column = column.astype(object)
+            self.columns[name] = column
+        
+        column[row] = value
+        self.present[name][row] = True
+        self._invalidate(name)
+    
+    
+    
+    
+    @staticmethod
+    def _dtype(value):
+        """
+        Returns the dtype of the column for storing value.
+        """
+        
+        if isinstance(value, (bool, np.bool_)):
+            return np.dtype(bool)
+        if isinstance(value, (int, np.integer)) and -2**63 <= value < 2**63:
+            return np.dtype(np.int64)
+        if isinstance(value, (float, np.floating)):
+            return np.dtype(np.float64)
+        return np.dtype(object)
+    
+    
+    
+    
+    @staticmethod
+    def _resize(array, capacity, length, fill=False):
+        """
+        Returns a copy of the first length entries of array with the given capacity.
+        """
+        
+        if array.dtype == object:
+            resized = np.empty(capacity, dtype=object)
+        else:
+            resized = np.full(capacity, fill, dtype=array.dtype)
+        resized[:length] = array[:length]
+        return resized
+
+
+
+
+class LazyData:
+    
+    """
+    Records transformations of Data instead of executing them, see Data.lazy. The row-wise steps interp_nan, interp_nonpositive, interp_invalid and interp_to are fused, i.e. every chunk of y-arrays runs through all of them before the next chunk is read, so no intermediate matrix is materialized. norm_max and norm_min need the extremum of all y-arrays and therefore end a stage: the extremum is found in a pass over the preceding stages and the division is fused into the following stage as a scale. The result is computed by collect, or reduced directly by the stat_* methods without materializing it at all.
+    
+    Every method returns a new LazyData, the Data itself is never changed.
+    """
+    
+    def __init__(self, data, ops=(), x=None):
+        """
+        Initializes a LazyData.
+        
+        Parameters
+        ----------
+            data: Data
+                The Data to be transformed.
+                
+            ops: tuple, optional
+                The recorded operations. Default is (), i.e. no operations.
+                
+            x: array or number, optional
+                The x-values after the recorded operations. Default is None, i.e. data.x.
+        """
+        
+        self.data = data
+        self.ops = tuple(ops)
+        self.x = data.x if x is None else x
+    
+    
+    
+    
+    def _record(self, op, x=None):
+        return LazyData(self.data, self.ops + (op,), self.x if x is None else x)
+    
+    
+    
+    
+    # ******************************************************** Recording *******************************************************
+    
+    def interp_nan(self, *index):
+        """
+        Records Data.interp_nan.
+        """
+        
+        return self.interp_invalid('nan', *index)
+    
+    
+    
+    def interp_nonpositive(self, *index):
+        """
+        Records Data.interp_nonpositive.
+        """
+        
+        return self.interp_invalid('nonpositive', *index)
+    
+    
+    
+    def interp_invalid(self, invalid, *index):
+        """
+        Records Data.interp_invalid.
+        """
+        
+        if invalid == 'nan':
+            invalid = np.isnan
+        elif invalid == 'nonpositive':
+            invalid = lambda y: ~(y > 0)
+        elif not callable(invalid):
+            raise TypeError("invalid must be 'nan', 'nonpositive' or callable.")
+        
+        selected = None
+        rows = self.data._select_rows(index)[0]
+        if rows is not None:
+            selected = np.zeros(self.data.length, dtype=bool)
+            selected[rows] = True
+        x = self.x
+        
+        def fill(block, rows):
+            mask = np.asarray(invalid(block), dtype=bool)
+            if selected is not None:
+                mask &= selected[rows][:,None]
+            gaps = np.flatnonzero(mask.any(axis=1))
+            if len(gaps) > 0:
+                gaprows, gapcols, values = Data._fill_gaps(x, block[gaps], mask[gaps])
+                block[gaps[gaprows], gapcols] = values
+            return block
+        
+        return self._record(('rows', fill, np.size(x)))
+    
+    
+    
+    def interp_to(self, x, method='linear'):
+        """
+        Records Data.interp_to.
+        """
+        
+        if type(x) not in (int, float, list, np.ndarray):
+            raise TypeError("x must be a number (int/float) or array-like.")
+        if self.data.dtype != 'arr-arr' or np.ndim(self.x) == 0:
+            raise ValueError("Only Data with dtype 'arr-arr' can be interpolated.")
+        
+        x = np.array(x)
+        terms = Data._interp_weights(self.x, x.reshape(-1), method)
+        
+        def interpolate(block, rows):
+            indices, weights = terms[0]
+            out = block[:,indices]*weights.astype(block.dtype)
+            for indices, weights in terms[1:]:
+                out += block[:,indices]*weights.astype(block.dtype)
+            return out
+        
+        return self._record(('rows', interpolate, x.size), x)
+    
+    
+    
+    def norm_max(self):
+        """
+        Records Data.norm_max.
+        """
+        
+        return self._record(('norm', np.max))
+    
+    
+    
+    def norm_min(self):
+        """
+        Records Data.norm_min.
+        """
+        
+        return self._record(('norm', np.min))
+    
+    
+    
+    
+    # ******************************************************** Execution *******************************************************
+    
+    def _stages(self):
+        """
+        Splits the operations at the norms into stages. Returns a list of (norm, rowops) pairs, where norm is the reduction of the preceding stages, by whose result the stage's input is divided, or None for the first stage.
+        """
+        
+        stages = [(None, [])]
+        for op in self.ops:
+            if op[0] == 'norm':
+                stages.append((op[1], []))
+            else:
+                stages[-1][1].append(op[1])
+        return stages
+    
+    
+    
+    
+    def _run(self, func, rows=None, rescale=None):
+        """
+        Pushes the y-arrays specified by rows (an index array or None for all) chunk by chunk through all stages and returns the list of func(chunk, block) in the order of the chunks, where chunk is the slice of the rows and block the transformed y-arrays.
+        
+        If the last operation is a norm, all rows are requested and rescale(result, scale) returns the result of func for the block divided by scale, the extremum of the norm is found in the same pass as the results, which are rescaled afterwards, instead of in a pass of its own.
+        """
+        
+        stages = self._stages()
+        fused = rescale != None and rows is None and len(stages) > 1 and len(stages[-1][1]) == 0
+        scales = []
+        for i in range(1, len(stages) - fused):
+            extrema = [e for e in self._pass(lambda c, block: stages[i][0](block) if block.size else None, None, stages[:i], scales) if e is not None]
+            scales.append(stages[i][0](extrema))
+        if not fused:
+            return self._pass(func, rows, stages, scales)
+        
+        norm = stages[-1][0]
+        results = self._pass(lambda c, block: (func(c, block), norm(block) if block.size else None), None, stages[:-1], scales)
+        scale = norm([e for r, e in results if e is not None])
+        return [rescale(r, scale) for r, e in results]
+    
+    
+    
+    
+    def _pass(self, func, rows, stages, scales):
+        """
+        Executes a single chunked pass through the given stages, dividing the input of stage i by scales[i-1].
+        """
+        
+        data = self.data
+        length = data.length if rows is None else len(rows)
+        width = max([np.size(data.x)] + [op[2] for op in self.ops if op[0] == 'rows'])
+        dtype = data._floating()
+        
+        def transform(c):
+            positions = np.arange(length)[c] if rows is None else rows[c]
+            block = np.array(data._y2d(positions), dtype=dtype)
+            for i in range(len(stages)):
+                if i > 0:
+                    block /= scales[i-1]
+                for op in stages[i][1]:
+                    block = op(block, positions)
+            return func(c, block)
+        
+        return data._map_chunks(transform, data._row_chunks(length, dtype.itemsize*width))
+    
+    
+    
+    
+    def collect(self):
+        """
+        Executes the recorded operations in a single chunked pass per stage and returns the result as a new Data.
+        
+        Returns
+        -------
+            data: Data
+                The transformed Data.
+        """
+        
+        data = self.data
+        if len(self.ops) == 0:
+            return Data(np.array(data.x), np.array(data.y), xname=data.xname, yname=data.yname, properties=data.properties.copy(), copy=False)
+        
+        y = np.empty((data.length, np.size(self.x)) if data.dtype == 'arr-arr' else data.length, dtype=data._floating())
+        y2d = y.reshape(data.length, -1)
+        
+        def store(c, block):
+            y2d[c] = block
+            return c
+        
+        def rescale(c, scale):
+            y2d[c] /= scale
+        
+        self._run(store, rescale=rescale)
+        if np.ndim(self.x) == 0 and data.dtype == 'arr-arr':
+            y = y.reshape(data.length)
+        elif data.dtype == 'num-num':
+            y = y.reshape(())
+        return Data(np.array(self.x), y, xname=data.xname, yname=data.yname, properties=data.properties.copy(), copy=False)
+    
+    
+    
+    
+    def _stat(self, func, index, scaling=None):
+        """
+        Reduces the transformed y-arrays specified by *index with func(y, axis=1) without materializing them, like the stat_* methods of Data with glob=False. If func(y/s) = func(y)/scaling(s), a trailing norm is fused into the same pass.
+        """
+        
+        rows, single = self.data._select_rows(index)
+        rescale = None if scaling == None else lambda values, scale: values/scaling(scale)
+        chunks = self._run(lambda c, block: func(block, axis=1), rows, rescale)
+        values = np.concatenate(chunks) if len(chunks) > 0 else np.zeros(0)
+        return values, single
+    
+    
+    
+    def _summary(self, index):
+        """
+        Returns the RunningStats of all values of the transformed y-arrays specified by *index.
+        """
+        
+        rows = self.data._select_rows(index)[0]
+        
+        def accumulate(c, block):
+            stats = RunningStats()
+            stats.update(block)
+            return stats
+        
+        stats = RunningStats()
+        for r in self._run(accumulate, rows):
+            stats.merge(r)
+        return stats.summary()
+    
+    
+    
+    def stat_max(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_max of the result without materializing it.
+        """
+        
+        values, single = self._stat(np.max, index)
+        return values[0] if single else (np.max(values) if glob else values)
+    
+    
+    
+    def stat_min(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_min of the result without materializing it.
+        """
+        
+        values, single = self._stat(np.min, index)
+        return values[0] if single else (np.min(values) if glob else values)
+    
+    
+    
+    def stat_mean(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_mean of the result without materializing it.
+        """
+        
+        values, single = self._stat(lambda b, axis: np.mean(b, axis=axis, dtype=np.float64), index, lambda s: s)
+        return values[0] if single else (np.mean(values) if glob else values)
+    
+    
+    
+    def stat_sum(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_sum of the result without materializing it.
+        """
+        
+        values, single = self._stat(lambda b, axis: np.sum(b, axis=axis, dtype=np.float64), index, lambda s: s)
+        return values[0] if single else (np.sum(values) if glob else values)
+    
+    
+    
+    def stat_var(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_var of the result without materializing it.
+        """
+        
+        if glob:
+            return self._summary(index)['var']
+        values, single = self._stat(lambda b, axis: np.var(b, axis=axis, dtype=np.float64), index, lambda s: s**2)
+        return values[0] if single else values
+    
+    
+    
+    def stat_std(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_std of the result without materializing it.
+        """
+        
+        if glob:
+            return self._summary(index)['std']
+        values, single = self._stat(lambda b, axis: np.std(b, axis=axis, dtype=np.float64), index, np.abs)
+        return values[0] if single else values
+    
+    
+    
+    def stat_median(self, *index, glob=False):
+        """
+        Executes the recorded operations and returns Data.stat_median of the result. With glob=True the transformed y-arrays specified by *index are materialized.
+        """
+        
+        if glob:
+            rows = self.data._select_rows(index)[0]
+            return np.median(np.concatenate(self._run(lambda c, block: block, rows)))
+        values, single = self._stat(np.median, index, lambda s: s)
+        return values[0] if single else values
+
+
+
+
+class DataCollection:
+    
+    """
+    Many Data objects with the same x-values stored together: the y-arrays of all members lie in one contiguous buffer of shape (total number of y-arrays, len(x)), member i owning the rows offsets[i]:offsets[i+1], x is stored once and the properties of all y-arrays form one PropertyTable. Statistics, interpolation and normalization run over the whole buffer in single chunked calls instead of a Python loop over the members, and the members are views into the buffer, which are copied on write like the views returned by Data.__getitem__, so changing a member does not change the collection.
+    """
+    
+    def __init__(self, datas, x=None, method='linear'):
+        """
+        Initializes a DataCollection.
+        
+        Parameters
+        ----------
+            datas: list of Data
+                The members, each with dtype 'arr-arr' and at least one y-array. They are copied into the collection.
+                
+            x: array-like, optional
+                The common x-values. If given, every member is interpolated to x with the given method, see Data.interp_to. Default is None, i.e. all members must have the same x-values.
+                
+            method: str, optional
+                The interpolation method, if x is given. Default is 'linear'.
+                
+        Raises
+        ------
+            ValueError
+                If there are no members, a member has another dtype than 'arr-arr' or no y-arrays, or if x is not given and the members have different x-values.
+        """
+        
+        if len(datas) == 0:
+            raise ValueError("A DataCollection needs at least one member.")
+        for data in datas:
+            if data.dtype != 'arr-arr' or data.length == 0:
+                raise ValueError("All members of a DataCollection must have dtype 'arr-arr' and at least one y-array.")
+        
+        if x is None:
+            grid = datas[0]._xgrid()
+            for data in datas[1:]:
+                other = data._xgrid()
+                if type(grid) != type(other) or (type(grid) == tuple and grid != other) or (type(grid) != tuple and not np.array_equal(grid, other)):
+                    raise ValueError("All members of a DataCollection must have the same x-values, unless x is given.")
+            x = datas[0].x
+        else:
+            x = np.array(x, dtype=np.float64).reshape(-1)
+        
+        counts = np.array([data.length for data in datas])
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        y = np.empty((self.offsets[-1], len(x)), dtype=np.result_type(*[data._floating() for data in datas]))
+        
+        for i, data in enumerate(datas):
+            rows = slice(self.offsets[i], self.offsets[i+1])
+            if data.xshape[0] == len(x) and (x is datas[0].x or np.array_equal(data.x, x)):
+                y[rows] = data.y
+            else:
+                terms = Data._interp_weights(data._xgrid(), x, method)
+                for c in data._row_chunks():
+                    block = data.y[c]
+                    target = y[rows][c]
+                    indices, weights = terms[0]
+                    np.multiply(block[:,indices], weights, out=target)
+                    for indices, weights in terms[1:]:
+                        target += block[:,indices]*weights
+        
+        self.ynames = [data.yname for data in datas]
+        self.data = Data(x, y, xname=datas[0].xname, properties=PropertyTable.concatenate([data.properties for data in datas]), copy=False)
+    
+    
+    
+    
+    # ******************************************************** Members *******************************************************
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    
+    
+    def __getitem__(self, i):
+        """
+        Returns member i as a view, i.e. Data, whose y-arrays are rows of the buffer and whose properties are a view of the PropertyTable of the collection. The storage is copied on write, see Data.__getitem__.
+        """
+        
+        if type(i) != int and not isinstance(i, np.integer):
+            raise TypeError("Members of a DataCollection are indexed by int.")
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("Index %d is out of range for DataCollection with %d members."%(i, len(self)))
+        
+        rows = slice(int(self.offsets[i]), int(self.offsets[i+1]))
+        member = self.data._view(rows)
+        member.yname = self.ynames[i]
+        return member
+    
+    
+    
+    def __iter__(self):
+        """
+        Iterates over the members as views, see DataCollection.__getitem__.
+        """
+        
+        for i in range(len(self)):
+            yield self[i]
+    
+    
+    
+    @property
+    def x(self):
+        return self.data.x
+    
+    
+    @property
+    def y(self):
+        return self.data.y
+    
+    
+    @property
+    def properties(self):
+        return self.data.properties
+    
+    
+    @property
+    def y3d(self):
+        """
+        The buffer as array of shape (members, y-arrays per member, len(x)) without copying. Only available, if all members have the same number of y-arrays.
+        """
+        
+        counts = np.diff(self.offsets)
+        if np.any(counts != counts[0]):
+            raise ValueError("y3d requires members with the same number of y-arrays.")
+        return self.data.y.reshape(len(self), counts[0], -1)
+    
+    
+    
+    
+    # ******************************************************** Numerical Manipulations *******************************************************
+    
+    def interp_to(self, x, method='linear'):
+        """
+        Interpolates all members to the array x in a single call, see Data.interp_to.
+        """
+        
+        self.data.interp_to(np.array(x, dtype=np.float64).reshape(-1), method)
+    
+    
+    
+    def norm_max(self):
+        """
+        Normalizes every member with respect to its own maximum value, as Data.norm_max does for each member.
+        """
+        
+        self._divide(self.stat_max(glob=True))
+    
+    
+    
+    def norm_min(self):
+        """
+        Normalizes every member with respect to its own minimum value, as Data.norm_min does for each member.
+        """
+        
+        self._divide(self.stat_min(glob=True))
+    
+    
+    
+    def _divide(self, values):
+        """
+        Divides the y-arrays of every member in place by the member's entry of values, chunk by chunk.
+        """
+        
+        data = self.data
+        if data._floating() != data.y.dtype:
+            data.y = data.y.astype(data._floating())
+        scale = np.repeat(values, np.diff(self.offsets))
+        y = data.y
+        
+        def divide(c):
+            y[c] /= scale[c,None]
+        
+        data._map_chunks(divide, data._row_chunks())
+    
+    
+    
+    
+    # ******************************************************** Statistics *******************************************************
+    
+    def stat_max(self, glob=False):
+        """
+        Find the maxima of all y-arrays (glob=False) or of every member (glob=True). The maxima of the y-arrays are found in a single chunked pass and combined per member with np.maximum.reduceat.
+        
+        Parameters
+        ----------
+            glob: bool, optional
+                If glob=False an array with the maximum of every y-array of all members is returned (member i owns the entries offsets[i]:offsets[i+1]). Otherwise an array with the maximum of every member is returned. Default is False.
+        
+        Returns
+        -------
+            maxima: numpy array
+                The maxima.
+        """
+        
+        maxima = self.data.stat_max()
+        return np.maximum.reduceat(maxima, self.offsets[:-1]) if glob else maxima
+    
+    
+    
+    def stat_min(self, glob=False):
+        """
+        Find the minima of all y-arrays (glob=False) or of every member (glob=True), see DataCollection.stat_max.
+        """
+        
+        minima = self.data.stat_min()
+        return np.minimum.reduceat(minima, self.offsets[:-1]) if glob else minima
+    
+    
+    
+    def stat_sum(self, glob=False):
+        """
+        Find the sums of all y-arrays (glob=False) or of every member (glob=True), see DataCollection.stat_max.
+        """
+        
+        sums = self.data.stat_sum()
+        return np.add.reduceat(sums, self.offsets[:-1]) if glob else sums
+    
+    
+    
+    def stat_mean(self, glob=False):
+        """
+        Find the means of all y-arrays (glob=False) or of every member (glob=True), see DataCollection.stat_max.
+        """
+        
+        means = self.data.stat_mean()
+        return np.add.reduceat(means, self.offsets[:-1])/np.diff(self.offsets) if glob else means
+    
+    
+    
+    def stat_var(self, glob=False):
+        """
+        Find the variances of all y-arrays (glob=False) or of every member (glob=True), see DataCollection.stat_max. The variances of the members are merged from the means and variances of their y-arrays, which all have the same number of values.
+        """
+        
+        summary = self.data.stat_summary()
+        if not glob:
+            return summary['var']
+        
+        counts = np.diff(self.offsets)
+        means = np.add.reduceat(summary['mean'], self.offsets[:-1])/counts
+        deviations = (summary['mean'] - np.repeat(means, counts))**2
+        return np.add.reduceat(summary['var'] + deviations, self.offsets[:-1])/counts
+    
+    
+    
+    def stat_std(self, glob=False):
+        """
+        Find the standard deviations of all y-arrays (glob=False) or of every member (glob=True), see DataCollection.stat_var.
+        """
+        
+        return np.sqrt(self.stat_var(glob=glob))
+    
+    
+    
+    def stat_median(self, glob=False):
+        """
+        Find the medians of all y-arrays (glob=False) or of every member (glob=True), see DataCollection.stat_max. For glob=True the members are reduced at once, if they all have the same number of y-arrays, and one by one otherwise.
+        """
+        
+        if not glob:
+            return self.data.stat_median()
+        
+        counts = np.diff(self.offsets)
+        if np.all(counts == counts[0]):
+            return np.median(self.y3d.reshape(len(self), -1), axis=1)
+        return np.array([np.median(self.data.y[self.offsets[i]:self.offsets[i+1]]) for i in range(len(self))])
@@ -0,0 +1,810 @@
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from dataanalysis import Data, DataCollection, PropertyTable, RunningStats
+
+
+MiB = 2**20
+
+
+def traced_peak(func):
+    """
+    Returns the result of func() and the peak of the memory traced by tracemalloc while running it, which includes the buffers allocated by NumPy.
+    """
+
+    tracemalloc.start()
+    try:
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+# ******************************************************* Memory-mapped Data ******************************************************
+
+def test_open_memmap_stat_mean_larger_than_memory_limit(tmp_path, monkeypatch):
+    limit = 4*MiB
+    rows, cols = 256, 16384
+
+    source = np.lib.format.open_memmap(str(tmp_path/'source.npy'), mode='w+', dtype=np.float64, shape=(rows, cols))
+    for start in range(0, rows, 16):
+        source[start:start+16] = np.add.outer(np.arange(start, start+16), np.arange(cols)/cols)
+    Data(np.arange(float(cols)), source, copy=False).save_memmap(str(tmp_path/'x.npy'), str(tmp_path/'y.npy'))
+    del source
+    assert os.path.getsize(tmp_path/'y.npy') > 8*limit
+
+    monkeypatch.setattr(Data, 'CHUNK_BYTES', MiB)
+    data, peak = traced_peak(lambda: Data.open_memmap(str(tmp_path/'x.npy'), str(tmp_path/'y.npy')))
+    assert isinstance(data.y, np.memmap)
+    assert peak < limit
+
+    means, peak = traced_peak(data.stat_mean)
+    assert peak < limit
+    np.testing.assert_allclose(means, np.arange(rows) + (cols-1)/(2*cols))
+    assert np.isclose(data.stat_mean(glob=True), (rows-1)/2 + (cols-1)/(2*cols))
+
+
+# ********************************************************* Construction **********************************************************
+
+def test_init_copies_x_and_y_once():
+    x = np.linspace(0, 1, 10000)**2
+    y = np.random.default_rng(0).random((200, 10000))
+
+    data, peak = traced_peak(lambda: Data(x, y))
+    assert peak < 1.1*(x.nbytes + y.nbytes)
+    assert data.y is not y and np.array_equal(data.y, y)
+    assert data.x is not x and np.array_equal(data.x, x)
+
+
+def test_init_without_copy_allocates_nothing():
+    x = np.linspace(0, 1, 10000)**2
+    y = np.random.default_rng(0).random((200, 10000))
+    properties = {0: {'temperature': 300}}
+
+    data, peak = traced_peak(lambda: Data(x, y, properties=properties, copy=False))
+    assert peak < MiB
+    assert data.x is x and data.y is y
+    assert data.get_xgrid() is None
+
+
+def test_init_without_copy_of_uniform_x_allocates_nothing():
+    x = np.arange(5e6)
+    y = np.zeros((2, len(x)))
+
+    data, peak = traced_peak(lambda: Data(x, y, copy=False))
+    assert peak < MiB
+    assert data.x is x and data.y is y
+    assert data.get_xgrid() == (0.0, 1.0, len(x))
+
+
+def test_storage_dtype_given_as_numpy_dtype():
+    data = Data(np.arange(3.0), np.array([[1, 2, 3]]), storage_dtype=np.dtype('float64'))
+    assert data.y.dtype == np.float64
+
+
+def test_appending_keeps_storage_dtype():
+    data = Data(np.arange(3.0), np.ones((2, 3)), storage_dtype=np.float32)
+    data.append(np.array([1.0, 2.0, 3.0]))
+    data.append(np.array([3.0, 4.0, 5.0, 6.0]), axis=1)
+    assert data.y.dtype == np.float32
+    assert data.y.shape == (3, 4)
+    np.testing.assert_array_equal(data.y[2], [1, 2, 3, 6])
+
+    data = Data(2.0, 3.0, storage_dtype=np.float32)
+    data.append(4.0)
+    assert data.y.dtype == np.float32
+
+    data = Data(np.arange(3.0), np.ones((1, 3), dtype=np.int64))
+    data.append(np.array([0.5, 1.5, 2.5]))
+    assert data.y.dtype == np.float64
+
+
+# ********************************************************* Representation ********************************************************
+
+def test_str_shows_only_the_visible_cells(monkeypatch, capsys):
+    data = Data(np.arange(1000.0), np.arange(100000.0).reshape(100, 1000), properties={i: {'t': i} for i in range(100)})
+    read = []
+    getitem = PropertyTable.__getitem__
+    monkeypatch.setattr(PropertyTable, '__getitem__', lambda self, key: read.append(key) or getitem(self, key))
+
+    table = str(data)
+    lines = table.split('\n')
+    assert capsys.readouterr().out == ''
+    assert sorted(read) == [0, 1, 2, 99]
+    assert len(lines) == Data.PRINT_TABLE_MAXDEPTH + 14
+    assert lines[3].split('|')[1:] == [' y[0,:]'.ljust(23), ' y[1,:]'.ljust(23), ' y[2,:]'.ljust(23), ' ... ', ' y[99,:]'.ljust(23)]
+    assert lines[5].split('|')[-1].strip() == 't:99'
+    assert [cell.strip() for cell in lines[7].split('|')] == ['0', '0', '1000', '2000', '...', '99000']
+    assert [cell.strip() for cell in lines[-2].split('|')] == ['999', '999', '1999', '2999', '...', '99999']
+    assert '......' in table
+
+
+def test_str_of_numbers():
+    lines = str(Data(1.5, 2.5)).split('\n')
+    assert [cell.strip() for cell in lines[5].split('|')] == ['1.5', '2.5']
+    lines = str(Data(1.5, np.array([2.5, 3.5]), properties={1: {'a': 1}})).split('\n')
+    assert [cell.strip() for cell in lines[3].split('|')] == ['x', 'y[0,:]', 'y[1,:]']
+    assert [cell.strip() for cell in lines[5].split('|')] == ['', 'NoProp', 'a:1']
+
+
+# ********************************************************** Appending ************************************************************
+
+def test_append_rows_reallocates_geometrically():
+    data = Data(np.arange(4.0), np.zeros((1, 4)))
+    buffers = [data._ybuf]
+    for i in range(1, 1000):
+        data.append(np.full(4, float(i)))
+        if data._ybuf is not buffers[-1]:
+            buffers.append(data._ybuf)
+
+    assert len(buffers) <= 12
+    assert data.length == 1000
+    np.testing.assert_array_equal(data.y[:,0], np.arange(1000.0))
+
+
+def test_reserve_append_samples_and_shrink_to_fit():
+    data = Data(np.linspace(0, 1, 4)**2, np.ones((3, 4)))
+    data.reserve(n_rows=10, n_samples=8)
+    buffer = data._ybuf
+    assert buffer.shape == (10, 8)
+
+    for i in range(4):
+        data.append(np.array([2.0 + i, 10.0, 20.0, 30.0]), axis=1)
+    data.append(np.arange(8.0))
+    assert data._ybuf is buffer
+    assert data.y.shape == (4, 8)
+    np.testing.assert_array_equal(data.x[4:], [2, 3, 4, 5])
+    np.testing.assert_array_equal(data.y[:3,4:], [[10]*4, [20]*4, [30]*4])
+
+    data.shrink_to_fit()
+    assert data._ybuf.shape == (4, 8)
+    np.testing.assert_array_equal(data.y[3], np.arange(8.0))
+
+
+# ********************************************************** Properties ***********************************************************
+
+def test_property_table_is_smaller_than_dict_of_dicts():
+    n = 20000
+    tracemalloc.start()
+    try:
+        properties = {i: {'temperature': 300.0 + i%7, 'pressure': 1.0, 'run': i//1000, 'detector': 3, 'valid': True} for i in range(n)}
+        dicts = tracemalloc.get_traced_memory()[0]
+        y = np.zeros((n, 2))
+        before = tracemalloc.get_traced_memory()[0]
+        data = Data(np.arange(2.0), y, properties=properties, copy=False)
+        del properties
+        table = tracemalloc.get_traced_memory()[0] - before + dicts
+    finally:
+        tracemalloc.stop()
+
+    assert table < dicts/4
+    assert data.get_properties(8) == {8: {'temperature': 301.0, 'pressure': 1.0, 'run': 0, 'detector': 3, 'valid': True}}
+    del data[0]
+    assert data.get_properties(0) == {0: {'temperature': 301.0, 'pressure': 1.0, 'run': 0, 'detector': 3, 'valid': True}}
+
+
+def test_select_and_where_after_del_append_and_set_properties():
+    y = np.arange(12.0).reshape(6, 2)
+    properties = {i: {'temperature': 300 + 10*(i%3), 'run': i} for i in range(6)}
+    data = Data(np.arange(2.0), y, properties=properties)
+
+    assert list(data.select(temperature=310)) == [1, 4]
+    assert list(data.where('run', '>=', 3)) == [3, 4, 5]
+    assert list(data.where('temperature', '!=', 300)) == [1, 2, 4, 5]
+    assert list(data.select(temperature=300, run=3)) == [3]
+    rows = data.select(temperature=310)
+    rows[0] = 5
+    assert list(data.select(temperature=310)) == [1, 4]
+
+    del data[1]
+    assert list(data.select(temperature=310)) == [3]
+    assert list(data.where('run', '<', 3)) == [0, 1]
+
+    data.append(np.array([20.0, 21.0]), properties=[{'temperature': 310, 'run': 6}])
+    data.set_properties({'temperature': 400, 'run': 7}, 0)
+    assert list(data.select(temperature=310)) == [3, 5]
+    assert list(data.where('run', '>', 5)) == [0, 5]
+
+    selected = data.select(as_data=True, temperature=310)
+    np.testing.assert_array_equal(selected.y, [[8, 9], [20, 21]])
+    assert selected.get_properties(1) == {1: {'temperature': 310, 'run': 6}}
+
+
+# *********************************************************** Deletion ************************************************************
+
+def test_qc_loop_deletion():
+    y = np.random.default_rng(0).random((4000, 64))
+    properties = {i: {'run': i} for i in range(len(y))}
+    bad = np.arange(0, len(y), 4)
+    alive = np.setdiff1d(np.arange(len(y)), bad)
+
+    data = Data(np.arange(64.0), y, properties=properties)
+    for k in bad[::-1]:
+        del data[int(k)]
+    assert data.length == len(alive)
+    assert np.array_equal(data[0:3].y, y[alive[:3]])
+    np.testing.assert_allclose(data.stat_mean(), y[alive].mean(axis=1))
+
+    data.compact()
+    assert np.array_equal(data.y, y[alive])
+    assert data.get_properties(0, len(alive)-1) == {0: {'run': 1}, len(alive)-1: {'run': len(y)-1}}
+    assert [data.properties[i]['run'] for i in range(data.length)] == list(alive)
+    assert list(data.select(run=5)) == [3] and list(data.select(run=4)) == []
+
+    dropped = Data(np.arange(64.0), y, properties=properties)
+    dropped.drop(bad)
+    assert np.array_equal(dropped.y, y[alive])
+    assert dropped.properties == data.properties
+
+
+# ************************************************************ Views **************************************************************
+
+def test_slicing_memmap_allocates_nothing(tmp_path):
+    rows, cols = 10000, 131072
+    y = np.lib.format.open_memmap(str(tmp_path/'y.npy'), mode='w+', dtype=np.float64, shape=(rows, cols))
+    data = Data(np.arange(float(cols)), y, properties={i: {'run': i} for i in range(rows)}, copy=False)
+    assert y.nbytes >= 10**10
+
+    view, peak = traced_peak(lambda: data[5000:5100])
+    assert peak < 64*2**10
+    assert view.length == rows//100
+    assert view.x is data.x
+    assert np.shares_memory(view.y, y)
+    assert view.get_properties(0) == {0: {'run': 5000}}
+
+
+def make_data():
+    y = np.arange(40.0).reshape(4, 10)
+    y[1,3] = np.nan
+    return Data(np.arange(10.0), y, properties={i: {'t': i} for i in range(4)})
+
+
+def test_writing_xslice_of_data_does_not_change_its_views():
+    data = make_data()
+    view = data[0:2]
+    data.xslice(0, 5)[0] = -1
+    assert np.array_equal(view.y[0], np.arange(10.0))
+    assert np.array_equal(data.y[0], np.arange(10.0))
+
+
+def test_writing_xslice_of_view_does_not_change_data():
+    data = make_data()
+    view = data[0:2]
+    window = view.xslice(0, 5)
+    window[0] = -7
+    assert np.all(window.y[0] == -7)
+    assert data.y[0,0] == 0 and view.y[0,0] == 0
+
+
+def test_interp_nan_on_xslice_of_view_does_not_change_data():
+    data = make_data()
+    window = data[0:2].xslice(0, 5)
+    window.interp_nan()
+    assert window.y[1,3] == 13
+    assert np.isnan(data.y[1,3])
+
+
+def test_interp_nan_with_xrange_changes_data():
+    data = make_data()
+    view = data[0:2]
+    data.interp_nan(xrange=(0, 5))
+    assert data.y[1,3] == 13
+    assert np.isnan(view.y[1,3])
+
+
+def test_at_is_copied_on_write():
+    data = make_data()
+    column = data.at(3.2)
+    column[0] = 100
+    assert data.y[0,3] == 3
+    data[1] = 5
+    assert np.array_equal(column.y, [100, np.nan, 23, 33], equal_nan=True)
+
+
+def test_xslice_and_at_do_not_read_every_property_row(monkeypatch):
+    data = make_data()
+
+    def fail(self, key):
+        raise AssertionError("row %d of the properties was read"%key)
+    monkeypatch.setattr(PropertyTable, '__getitem__', fail)
+
+    assert data.xslice(2, 4).length == 4
+    assert data.at(3.2).length == 4
+    assert data.stat_mean(0, xrange=(2, 4)) == 3
+    assert Data(data.x, data.y, properties=data.properties, copy=False).length == 4
+    assert data.properties != None
+
+
+def test_select_after_writing_properties_through_xslice():
+    data = make_data()
+    assert list(data.select(t=1)) == [1]
+    window = data.xslice(0, 5)
+    window.set_properties({'t': 99}, 1)
+    window.properties[2] = {'t': 2.5, 'new': 'key'}
+
+    assert data.get_properties(1, 2) == {1: {'t': 1}, 2: {'t': 2}}
+    assert list(data.select(t=99)) == [] and list(data.select(t=1)) == [1]
+    assert list(data.where('new', '==', 'key')) == []
+    assert list(window.select(t=99)) == [1] and list(window.select(new='key')) == [2]
+
+
+def test_select_on_xslice_after_writing_properties_of_data():
+    data = make_data()
+    window = data.xslice(0, 5)
+    assert list(window.select(t=2)) == [2]
+    data.properties[2] = {'t': 50}
+
+    assert list(data.select(t=50)) == [2]
+    assert window.get_properties(2) == {2: {'t': 2}}
+    assert list(window.select(t=50)) == [] and list(window.select(t=2)) == [2]
+
+
+def test_datacollection_members_are_copied_on_write():
+    first = Data(np.arange(5.0), np.ones((2, 5)), yname='first', properties={0: {'t': 1}})
+    second = Data(np.arange(5.0), 2*np.ones((3, 5)), yname='second')
+    collection = DataCollection([first, second])
+
+    member = collection[1]
+    assert member.yname == 'second' and member.length == 3
+    assert np.shares_memory(member.y, collection.data.y)
+    member[0] = 9
+    member.set_properties({'t': 5}, 0)
+    assert np.all(collection.data.y[2] == 2)
+    assert collection.data.get_properties(2) == {2: None}
+    assert list(collection.data.select(t=5)) == []
+
+
+# ********************************************************** Statistics ***********************************************************
+
+def test_stat_corr_into_file_is_memory_bounded(tmp_path, monkeypatch):
+    limit = 4*MiB
+    rows = 2000
+    y = np.random.default_rng(0).random((rows, 4))
+    data = Data(np.arange(4.0), y)
+    assert 8*rows**2 > 6*limit
+
+    monkeypatch.setattr(Data, 'CHUNK_BYTES', MiB)
+    corr, peak = traced_peak(lambda: data.stat_corr(out=str(tmp_path/'corr.npy')))
+    assert peak < limit
+    assert isinstance(corr, np.memmap)
+    np.testing.assert_allclose(corr, np.corrcoef(y), atol=1e-12)
+
+
+def test_running_stats_merge_of_generator_chunks():
+    values = np.random.default_rng(1).normal(1e9, 1e-3, 10000)
+    parts = []
+    for chunk in (values[i:i+700] for i in range(0, len(values), 700)):
+        stats = RunningStats()
+        stats.update(chunk)
+        parts.append(stats)
+    merged = RunningStats()
+    for stats in parts:
+        merged.merge(stats)
+
+    summary = merged.summary()
+    assert summary['count'] == len(values)
+    assert summary['min'] == values.min() and summary['max'] == values.max()
+    np.testing.assert_allclose(summary['mean'], values.mean(), rtol=1e-15)
+    np.testing.assert_allclose(summary['var'], np.var(values), rtol=1e-6)
+
+
+def test_stat_summary_per_row_and_glob():
+    y = np.random.default_rng(2).random((50, 30))
+    data = Data(np.arange(30.0), y)
+
+    summary = data.stat_summary(chunk=7)
+    np.testing.assert_allclose(summary['mean'], y.mean(axis=1))
+    np.testing.assert_allclose(summary['var'], y.var(axis=1))
+    np.testing.assert_array_equal(summary['min'], y.min(axis=1))
+    np.testing.assert_array_equal(summary['max'], y.max(axis=1))
+    np.testing.assert_allclose(summary['sum'], y.sum(axis=1))
+    assert np.all(summary['count'] == 30)
+
+    summary = data.stat_summary(slice(10, 20), glob=True, chunk=3)
+    np.testing.assert_allclose(summary['std'], y[10:20].std())
+    assert summary['count'] == 300
+    np.testing.assert_allclose(data.stat_var(glob=True), y.var())
+    np.testing.assert_allclose(data.stat_std(glob=True), y.std())
+
+
+def test_stat_methods_accept_ints_slices_masks_and_index_arrays():
+    y = np.random.default_rng(3).random((20, 9))
+    data = Data(np.arange(9.0), y)
+    mask = np.arange(20)%3 == 0
+    reductions = {'max': np.max, 'min': np.min, 'mean': np.mean, 'median': np.median, 'var': np.var, 'std': np.std, 'sum': np.sum}
+
+    for name, reduce in reductions.items():
+        stat = getattr(data, 'stat_' + name)
+        np.testing.assert_allclose(stat(), reduce(y, axis=1))
+        np.testing.assert_allclose(stat(1, 4, 7), reduce(y[[1, 4, 7]], axis=1))
+        np.testing.assert_allclose(stat(slice(2, 12, 3)), reduce(y[2:12:3], axis=1))
+        np.testing.assert_allclose(stat(mask), reduce(y[mask], axis=1))
+        np.testing.assert_allclose(stat(np.array([5, 0, 5])), reduce(y[[5, 0, 5]], axis=1))
+        np.testing.assert_allclose(stat(6), reduce(y[6]))
+        np.testing.assert_allclose(stat(slice(0, 10), glob=True), reduce(y[:10]))
+
+    with pytest.raises(IndexError):
+        data.stat_mean(20)
+    with pytest.raises(IndexError):
+        data.stat_mean(np.ones(5, dtype=bool))
+
+
+
+def test_thread_pool_gives_the_results_of_the_calling_thread(monkeypatch):
+    monkeypatch.setattr(Data, 'CHUNK_BYTES', 4096)
+    y = np.random.default_rng(8).random((40, 100))
+    y[y < 0.05] = 0
+    serial = Data(np.arange(100.0), y)
+    parallel = Data(np.arange(100.0), y)
+    parallel.set_executor(4)
+
+    for name in ('stat_mean', 'stat_var', 'stat_median', 'stat_max'):
+        assert np.array_equal(getattr(parallel, name)(), getattr(serial, name)())
+    for data in (serial, parallel):
+        data.interp_nonpositive()
+        data.norm_max()
+    assert np.array_equal(parallel.y, serial.y)
+    parallel.set_executor()
+
+    with pytest.raises(ValueError):
+        parallel.set_executor(0)
+    with pytest.raises(TypeError):
+        parallel.set_executor('threads')
+
+# ********************************************************* Interpolation *********************************************************
+
+def interp_rows(x, y, invalid):
+    expected = y.copy()
+    for row, mask in zip(expected, invalid):
+        if mask.any():
+            row[mask] = np.interp(x[mask], x[~mask], row[~mask])
+    return expected
+
+
+def test_interp_nan_matches_np_interp_per_row():
+    rng = np.random.default_rng(4)
+    x = np.cumsum(rng.random(40))
+    y = rng.random((30, 40))
+    y[rng.random(y.shape) < 0.1] = np.nan
+    y[:,0] = 0.5
+    y[5] = 1.0
+    expected = interp_rows(x, y, np.isnan(y))
+
+    data = Data(x, y)
+    data.interp_nan()
+    np.testing.assert_allclose(data.y, expected)
+    assert np.all(data.y[5] == 1)
+
+
+def test_interp_nonpositive_and_callable_on_selected_rows():
+    x = np.arange(6.0)
+    y = np.array([[1.0, -1, 3, 0, 5, 6], [-2, 2, 3, 4, 0, 6], [1, 2, 30, 4, 5, 6]])
+
+    data = Data(x, y)
+    data.interp_nonpositive(0, 1)
+    np.testing.assert_allclose(data.y[:2], interp_rows(x, y[:2], ~(y[:2] > 0)))
+    np.testing.assert_array_equal(data.y[2], y[2])
+
+    data.interp_invalid(lambda block: block > 10, np.array([2]))
+    np.testing.assert_allclose(data.y[2], np.arange(1.0, 7.0))
+
+    data = Data(x, np.full((1, 6), np.nan))
+    with pytest.raises(ValueError):
+        data.interp_nan()
+
+
+@pytest.mark.parametrize('xold', [np.linspace(0, 2*np.pi, 50), (0.0, 2*np.pi/49, 50)])
+def test_interp_to_methods(xold):
+    grid = np.linspace(0, 2*np.pi, 50)
+    y = np.vstack([np.sin(grid), 2*grid + 1])
+    xnew = np.array([-1.0, 0.05, 1.0, 3.33, 6.0, 7.0])
+
+    data = Data(xold, y)
+    data.interp_to(xnew)
+    np.testing.assert_array_equal(data.x, xnew)
+    np.testing.assert_allclose(data.y, [np.interp(xnew, grid, row) for row in y])
+
+    data = Data(xold, y)
+    data.interp_to(xnew, method='nearest')
+    nearest = np.abs(xnew[:,None] - grid[None,:]).argmin(axis=1)
+    np.testing.assert_allclose(data.y, y[:,nearest])
+
+    data = Data(xold, y)
+    data.interp_to(xnew, method='previous')
+    previous = np.clip(np.searchsorted(grid, xnew, side='right') - 1, 0, 49)
+    np.testing.assert_allclose(data.y, y[:,previous])
+
+    data = Data(xold, y)
+    data.interp_to(xnew[1:5], method='cubic')
+    np.testing.assert_allclose(data.y[0], np.sin(xnew[1:5]), atol=1e-3)
+    np.testing.assert_allclose(data.y[1], 2*xnew[1:5] + 1)
+
+    with pytest.raises(ValueError):
+        Data(xold, y).interp_to(xnew, method='spline')
+
+
+def test_interp_to_number_and_out():
+    data = Data(np.arange(5.0), np.array([[0.0, 1, 2, 3, 4], [0, 2, 4, 6, 8]]))
+    out = np.empty((2, 3))
+    data.interp_to([0.5, 1.5, 3.25], out=out)
+    assert data.y is out
+    np.testing.assert_allclose(out, [[0.5, 1.5, 3.25], [1, 3, 6.5]])
+
+    data.interp_to(1.0)
+    assert data.dtype == 'num-arr'
+    np.testing.assert_allclose(data.y, [1, 2])
+
+    with pytest.raises(ValueError):
+        Data(np.arange(5.0), np.ones((2, 5))).interp_to([1.0], out=np.empty((2, 2)))
+
+
+# ********************************************************* Normalization *********************************************************
+
+def test_norm_of_num_num_data():
+    data = Data(2.0, 4.0)
+    data.norm_max()
+    assert data.y == 1
+
+    data = Data(2.0, -4)
+    data.norm_min()
+    assert data.y == 1 and data.y.dtype == np.float64
+
+
+def test_norm_max_of_arrays():
+    data = Data(np.arange(3.0), np.array([[1, 2, 4], [0, 1, 2]]))
+    data.norm_max()
+    np.testing.assert_allclose(data.y, [[0.25, 0.5, 1], [0, 0.25, 0.5]])
+
+
+# ******************************************************** Saving/Loading *********************************************************
+
+def test_load_reads_only_the_requested_part(tmp_path):
+    rows, cols = 20, 100000
+    y = np.add.outer(np.arange(rows), np.arange(cols)/cols)
+    Data(np.arange(float(cols)), y).save(str(tmp_path/'data.dat'))
+    del y
+
+    data, peak = traced_peak(lambda: Data.load(str(tmp_path/'data.dat'), rows=slice(0, 10), xrange=(0, 9)))
+    assert peak < 2*MiB
+    assert data.y.shape == (10, 10)
+    np.testing.assert_allclose(data.y, np.add.outer(np.arange(10), np.arange(10)/cols))
+    assert np.array_equal(data.x, np.arange(10.0))
+
+
+# *********************************************************** Plotting ************************************************************
+
+@pytest.fixture
+def plt():
+    matplotlib = pytest.importorskip('matplotlib')
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.close('all')
+    yield plt
+    plt.close('all')
+
+
+def test_import_does_not_import_matplotlib():
+    code = "import sys, dataanalysis; dataanalysis.Data(1.0, 2.0).stat_mean(); print('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_plot_decimate_keeps_minima_and_maxima(plt):
+    x = np.arange(100000.0)
+    y = np.sin(x/500)*np.random.default_rng(0).random(len(x))
+    y[12345] = 5
+    y[67890] = -5
+    data = Data(x, y[None,:])
+
+    data.plot(decimate=True, legend=False)
+    line = plt.gca().get_lines()[0]
+    xplotted, yplotted = line.get_data()
+    buckets = Data._plot_buckets(plt.gca())
+    assert len(xplotted) <= 4*buckets
+    assert np.all(np.diff(xplotted) > 0)
+    assert np.array_equal(yplotted, y[xplotted.astype(int)])
+    assert 12345 in xplotted and 67890 in xplotted
+
+    plt.gca().set_xlim(60000, 70000)
+    xzoomed, yzoomed = line.get_data()
+    assert xzoomed[0] <= 60000 and xzoomed[-1] >= 70000
+    assert len(xzoomed) <= 4*buckets
+    assert 67890 in xzoomed and 12345 not in xzoomed
+
+
+def test_plot_minmax_indices_bound_every_bucket():
+    y = np.random.default_rng(1).random(1000)
+    levels = Data._minmax_levels(y)
+    visible = Data._minmax_indices(levels, 100, 900, 10)
+    assert 10 <= len(visible) <= 4*10*2
+    assert y[visible].max() >= y[100:900].max() and y[visible].min() <= y[100:900].min()
+    for k, (imin, imax) in enumerate(levels[:5], 1):
+        np.testing.assert_array_equal(y[imin[:-1]], y[:len(imin[:-1]) << k].reshape(-1, 2**k).min(axis=1))
+        np.testing.assert_array_equal(y[imax[:-1]], y[:len(imax[:-1]) << k].reshape(-1, 2**k).max(axis=1))
+
+
+def test_plot_correlmat_coef_and_density_images(plt):
+    rng = np.random.default_rng(2)
+    y = rng.random((3, 500))
+    y[1] = 2*y[0] + 1
+    data = Data(np.arange(500.0), y)
+
+    data.plot_correlmat(mode='coef', upper=True)
+    image = plt.gcf().axes[0].get_images()[0].get_array()
+    assert image.shape == (3, 3)
+    np.testing.assert_allclose(image[np.triu_indices(3)], np.corrcoef(y)[np.triu_indices(3)])
+    assert np.all(np.ma.getmaskarray(image)[np.tril_indices(3, -1)] | np.isnan(image.data)[np.tril_indices(3, -1)])
+
+    data.plot_correlmat(mode='density', bins=4)
+    assert len(plt.gcf().axes) == 1
+    image = plt.gcf().axes[0].get_images()[0].get_array()
+    assert image.shape == (12, 12)
+    histograms = data._pair_histograms(4)
+    for i in range(3):
+        for j in range(3):
+            lo, hi = y.min(axis=1), y.max(axis=1)
+            expected = np.histogram2d(y[i], y[j], bins=4, range=[(lo[i], hi[i]), (lo[j], hi[j])])[0]
+            np.testing.assert_array_equal(histograms[4*i:4*i+4, 4*j:4*j+4], expected)
+
+    with pytest.raises(ValueError):
+        data.plot_correlmat(mode='hexbin')
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_save_and_load_round_trip(tmp_path, compress):
+    y = np.random.default_rng(3).random((7, 50))
+    data = Data(np.linspace(0, 1, 50), y, properties={i: {'run': i, 'ok': i%2 == 0} for i in range(7)}, xname='t', yname='v')
+    data.save(str(tmp_path/'data.dat'), compress=compress, chunk_rows=3)
+
+    loaded = Data.load(str(tmp_path/'data.dat'))
+    assert np.array_equal(loaded.x, data.x) and np.array_equal(loaded.y, y)
+    assert loaded.xname == 't' and loaded.yname == 'v' and loaded.dtype == 'arr-arr'
+    assert [loaded.properties[i] for i in range(7)] == [data.properties[i] for i in range(7)]
+
+    part = Data.load(str(tmp_path/'data.dat'), rows=[1, 5, 6], xrange=(0.2, 0.5))
+    window = (data.x >= 0.2) & (data.x <= 0.5)
+    assert np.array_equal(part.x, data.x[window])
+    assert np.array_equal(part.y, y[[1, 5, 6]][:,window])
+    assert [part.properties[i] for i in range(3)] == [{'run': k, 'ok': k%2 == 0} for k in (1, 5, 6)]
+
+
+def test_save_and_load_num_num(tmp_path):
+    Data(2.0, 4.0).save(str(tmp_path/'data.dat'))
+    loaded = Data.load(str(tmp_path/'data.dat'))
+    assert loaded.dtype == 'num-num' and loaded.x == 2 and loaded.y == 4
+
+
+def test_read_csv_in_chunks_with_header_and_memmap(tmp_path):
+    x = np.arange(0, 5, 0.25)
+    y = np.random.default_rng(4).random((3, len(x)))
+    with open(tmp_path/'data.tsv', 'w') as f:
+        f.write('time\ta\tb\tc\n')
+        for i in range(len(x)):
+            f.write('\t'.join('%.17g'%v for v in [x[i]] + list(y[:,i])) + '\n')
+
+    data = Data.read_csv(str(tmp_path/'data.tsv'), chunk_rows=3, properties_from_header='channel', memmap=str(tmp_path/'y.npy'))
+    assert isinstance(data.y, np.memmap)
+    assert np.array_equal(data.x, x) and np.array_equal(data.y, y)
+    assert data.xname == 'time'
+    assert [data.properties[i] for i in range(3)] == [{'channel': 'a'}, {'channel': 'b'}, {'channel': 'c'}]
+
+    data = Data.read_csv(str(tmp_path/'data.tsv'), x_col=None, dtype=np.float32)
+    assert np.array_equal(data.x, np.arange(len(x))) and data.y.dtype == np.float32
+    np.testing.assert_allclose(data.y, np.vstack([x, y]).astype(np.float32))
+
+
+def test_read_csv_rejects_ragged_lines(tmp_path):
+    (tmp_path/'data.csv').write_text('1,2,3\n4,5\n')
+    with pytest.raises(ValueError):
+        Data.read_csv(str(tmp_path/'data.csv'))
+    with pytest.raises(ValueError):
+        Data.read_csv(str(tmp_path/'data.csv'), properties_from_header=True)
+
+
+def test_to_csv_npz_and_columns_round_trips(tmp_path, monkeypatch):
+    monkeypatch.setattr(Data, 'CHUNK_BYTES', 256)
+    y = np.random.default_rng(5).random((4, 40))
+    properties = {0: {'name': 'a', 'gain': 1.5}, 1: None, 2: {'name': 'c'}, 3: {'gain': 2.0, 'tags': [1, 2]}}
+    data = Data(np.linspace(-1, 1, 40), y, properties=properties, xname='t', yname='v')
+
+    data.to_csv(str(tmp_path/'data.csv'), properties_to_header=True)
+    with open(tmp_path/'data.csv') as f:
+        assert f.readline() == 't,a,v1,c,v3\n'
+    loaded = Data.read_csv(str(tmp_path/'data.csv'))
+    assert np.array_equal(loaded.x, data.x) and np.array_equal(loaded.y, y)
+
+    data.to_npz(str(tmp_path/'data.npz'), compress=True)
+    npz = np.load(str(tmp_path/'data.npz'))
+    assert np.array_equal(npz['x'], data.x) and np.array_equal(npz['y'], y)
+    assert str(npz['xname']) == 't' and str(npz['yname']) == 'v'
+    assert {int(k): v for k, v in json.loads(str(npz['properties'])).items()} == properties
+
+    data.to_columns(str(tmp_path/'columns'))
+    for mmap_mode in (None, 'r'):
+        loaded = Data.read_columns(str(tmp_path/'columns'), mmap_mode=mmap_mode)
+        assert np.array_equal(loaded.x, data.x) and np.array_equal(loaded.y, y)
+        assert loaded.xname == 't' and loaded.yname == 'v'
+        assert [loaded.properties[i] for i in range(4)] == [properties[i] for i in range(4)]
+    assert isinstance(loaded.y, np.memmap)
+
+
+def test_to_csv_rejects_numbers():
+    with pytest.raises(ValueError):
+        Data(1.0, 2.0).to_csv('unused.csv')
+
+
+# ********************************************************** Lazy chains **********************************************************
+
+@pytest.mark.parametrize('method', ['linear', 'nearest'])
+def test_lazy_chain_equals_eager_chain(monkeypatch, method):
+    monkeypatch.setattr(Data, 'CHUNK_BYTES', 1024)
+    rng = np.random.default_rng(6)
+    y = rng.random((9, 60)) + 0.5
+    y[rng.random(y.shape) < 0.1] = -1
+    y[:, 0] = y[:, -1] = 1
+    y[3, 10:20] = np.nan
+    data = Data(np.arange(60.0), y)
+    grid = np.linspace(0, 59, 25)
+
+    eager = Data(np.arange(60.0), y)
+    eager.interp_nan()
+    eager.interp_nonpositive()
+    eager.interp_to(grid, method=method)
+    eager.norm_max()
+
+    lazy = data.lazy().interp_nan().interp_nonpositive().interp_to(grid, method=method).norm_max()
+    collected = lazy.collect()
+    np.testing.assert_allclose(collected.x, grid)
+    np.testing.assert_allclose(collected.y, eager.y)
+    np.testing.assert_allclose(lazy.stat_mean(), eager.stat_mean())
+    np.testing.assert_allclose(lazy.stat_std(1, 4), eager.stat_std(1, 4))
+    np.testing.assert_allclose(lazy.stat_var(glob=True), eager.stat_var(glob=True))
+    np.testing.assert_allclose(lazy.stat_median(glob=True), eager.stat_median(glob=True))
+    np.testing.assert_allclose(lazy.stat_max(2), eager.stat_max(2))
+    np.testing.assert_allclose(lazy.stat_max(glob=True), 1)
+    np.testing.assert_array_equal(data.y, y)
+
+
+# ********************************************************* Collections ***********************************************************
+
+@pytest.mark.parametrize('counts', [(2, 2, 2), (1, 3, 2)])
+def test_datacollection_glob_stats_match_members(counts):
+    rng = np.random.default_rng(7)
+    x = np.linspace(0, 1, 30)
+    datas = [Data(x, rng.random((n, 30))*(i + 1), properties={r: {'member': i} for r in range(n)}) for i, n in enumerate(counts)]
+    collection = DataCollection(datas)
+
+    assert len(collection) == 3
+    assert [collection.properties[r]['member'] for r in range(sum(counts))] == [i for i, n in enumerate(counts) for r in range(n)]
+    for name in ('max', 'min', 'sum', 'mean', 'var', 'std', 'median'):
+        reference = getattr(np, name)
+        np.testing.assert_allclose(getattr(collection, 'stat_' + name)(glob=True), [reference(data.y) for data in datas])
+        np.testing.assert_allclose(getattr(collection, 'stat_' + name)(), np.concatenate([reference(data.y, axis=1) for data in datas]))
+
+    collection.norm_max()
+    for i, data in enumerate(datas):
+        np.testing.assert_allclose(collection[i].y, data.y/data.y.max())
+
+
+def test_datacollection_interpolates_members_to_common_x():
+    first = Data(np.linspace(0, 1, 11), np.vstack([np.linspace(0, 1, 11), np.linspace(1, 2, 11)]))
+    second = Data(np.linspace(0, 1, 21), 2*np.linspace(0, 1, 21)[None,:])
+    grid = np.linspace(0, 1, 5)
+
+    collection = DataCollection([first, second], x=grid)
+    np.testing.assert_allclose(collection.y, [grid, grid + 1, 2*grid])
+    np.testing.assert_allclose(collection[1].y, [2*grid])
+
+    collection.interp_to([0.1, 0.6])
+    np.testing.assert_allclose(collection.x, [0.1, 0.6])
+    np.testing.assert_allclose(collection.y, [[0.1, 0.6], [1.1, 1.6], [0.2, 1.2]])
+
+    with pytest.raises(ValueError):
+        DataCollection([first, second])